@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from async_gpt import MAX_CONCURRENT_REQUESTS
+
+SESSION_REQUESTS_PER_MINUTE = float(os.getenv("GPT_SESSION_RPM", "6"))
+SESSION_BURST = int(os.getenv("GPT_SESSION_BURST", "3"))
+MAX_QUEUED_REQUESTS = int(os.getenv("GPT_MAX_QUEUE", "50"))
+MAX_QUEUE_WAIT_SECONDS = 60
+
+
+class AdmissionRejected(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def full(self):
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.capacity
+
+    def retry_after(self):
+        return (1 - self.tokens) / self.rate
+
+
+class Ticket:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.admitted = False
+        self.released = False
+
+
+class AdmissionScheduler:
+    # очередь на сессию + обход сессий по кругу, чтобы один пользователь не занял все слоты
+    def __init__(self, max_active=MAX_CONCURRENT_REQUESTS, max_queued=MAX_QUEUED_REQUESTS,
+                 rate_per_minute=SESSION_REQUESTS_PER_MINUTE, burst=SESSION_BURST):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.condition = threading.Condition()
+        self.buckets = {}
+        self.queues = {}
+        self.round_robin = deque()
+        self.queued = 0
+        self.active = 0
+
+    def submit(self, session_id):
+        with self.condition:
+            if len(self.buckets) > 1000:
+                # полные корзины ничего не помнят, их можно выбросить
+                for old_session in [sid for sid, b in self.buckets.items() if b.full()]:
+                    del self.buckets[old_session]
+            bucket = self.buckets.setdefault(session_id, TokenBucket(self.rate, self.burst))
+            if not bucket.take():
+                raise AdmissionRejected(
+                    f"Слишком много вопросов подряд, попробуйте через {bucket.retry_after():.0f} с"
+                )
+            if self.queued >= self.max_queued:
+                raise AdmissionRejected("Сервис перегружен, попробуйте чуть позже")
+
+            ticket = Ticket(session_id)
+            if session_id not in self.queues:
+                self.queues[session_id] = deque()
+                self.round_robin.append(session_id)
+            self.queues[session_id].append(ticket)
+            self.queued += 1
+            self._dispatch()
+            return ticket
+
+    def _dispatch(self):
+        while self.active < self.max_active and self.round_robin:
+            session_id = self.round_robin.popleft()
+            ticket = self.queues[session_id].popleft()
+            if self.queues[session_id]:
+                self.round_robin.append(session_id)
+            else:
+                del self.queues[session_id]
+            ticket.admitted = True
+            self.queued -= 1
+            self.active += 1
+        self.condition.notify_all()
+
+    def position(self, ticket):
+        # сколько запросов уйдет раньше при обходе по кругу
+        with self.condition:
+            if ticket.admitted:
+                return 0
+            own_queue = self.queues.get(ticket.session_id, ())
+            if ticket not in own_queue:
+                return 0
+            rank = list(own_queue).index(ticket)
+            own_turn = list(self.round_robin).index(ticket.session_id)
+            ahead = 0
+            for turn, session_id in enumerate(self.round_robin):
+                ahead += min(len(self.queues[session_id]), rank + (1 if turn < own_turn else 0))
+            return ahead + 1
+
+    def wait(self, ticket, on_wait=None, timeout=MAX_QUEUE_WAIT_SECONDS):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.condition:
+                if ticket.admitted:
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AdmissionRejected("Очередь не дошла, попробуйте позже")
+            if on_wait is not None:
+                on_wait(self.position(ticket))
+            with self.condition:
+                if not ticket.admitted:
+                    self.condition.wait(min(remaining, 0.5))
+
+    def release(self, ticket):
+        with self.condition:
+            if ticket.released:
+                return
+            ticket.released = True
+            if ticket.admitted:
+                self.active -= 1
+            else:
+                session_queue = self.queues.get(ticket.session_id)
+                if session_queue and ticket in session_queue:
+                    session_queue.remove(ticket)
+                    self.queued -= 1
+                    if not session_queue:
+                        del self.queues[ticket.session_id]
+                        self.round_robin.remove(ticket.session_id)
+            self._dispatch()
+
+    def stats(self):
+        with self.condition:
+            return {"active": self.active, "queued": self.queued, "sessions_waiting": len(self.queues)}
+
+
+@st.cache_resource
+def get_admission_scheduler():
+    return AdmissionScheduler()
@@ -0,0 +1,86 @@
+import pandas as pd
+
+from price_sketch import build_price_sketches, merge_sketches
+from skyline import build_pareto_cells, merge_pareto_cells
+
+# колонки, по которым страница статистики строит value_counts
+STAT_COUNT_COLUMNS = [
+    'device_type', 'brand', 'os', 'form_factor', 'cpu_brand', 'cpu_tier', 'cpu_cores', 'ram_gb',
+    'storage_type', 'storage_drive_count', 'gpu_brand', 'gpu_tier', 'vram_gb', 'display_type',
+    'resolution', 'refresh_hz', 'warranty_months', 'wifi', 'bluetooth',
+    # из этих двух статистика собирает группы размеров через pd.cut
+    'storage_gb', 'display_size_in',
+]
+
+# все агрегаты - счетчики или суммы, поэтому агрегат всех данных = сумма агрегатов частей
+COUNT_KEYS = {
+    'year_brand_counts': ['release_year', 'brand'],
+    'brand_device_counts': ['brand', 'device_type'],
+    **{f'{col}_counts': [col] for col in STAT_COUNT_COLUMNS},
+}
+
+
+def order_counts(counts, keys):
+    # одна колонка - по убыванию, как value_counts; несколько - по ключам, чтобы линии по годам шли по порядку
+    if len(keys) == 1:
+        counts = counts.sort_values('count', ascending=False, kind='stable')
+    else:
+        counts = counts.sort_values(keys)
+    return counts.reset_index(drop=True)
+
+
+def count_values(df, keys):
+    return order_counts(df.groupby(keys).size().reset_index(name='count'), keys)
+
+
+def build_brand_profiles(df):
+    return df.groupby('brand').agg(
+        count=('price', 'size'),
+        price_sum=('price', 'sum'),
+        year_min=('release_year', 'min'),
+        year_max=('release_year', 'max'),
+    ).reset_index()
+
+
+def build_aggregates(df):
+    aggregates = {name: count_values(df, keys) for name, keys in COUNT_KEYS.items()}
+    aggregates['brand_profiles'] = build_brand_profiles(df)
+    aggregates['year_brand_price_sketches'] = build_price_sketches(df)
+    aggregates['pareto_cells'] = build_pareto_cells(df)
+    return aggregates
+
+
+def merge_aggregates(previous, delta):
+    merged = {}
+    for name, keys in COUNT_KEYS.items():
+        counts = pd.concat([previous[name], delta[name]], ignore_index=True)
+        merged[name] = order_counts(counts.groupby(keys, as_index=False)['count'].sum(), keys)
+
+    profiles = pd.concat([previous['brand_profiles'], delta['brand_profiles']], ignore_index=True)
+    merged['brand_profiles'] = profiles.groupby('brand', as_index=False).agg(
+        count=('count', 'sum'),
+        price_sum=('price_sum', 'sum'),
+        year_min=('year_min', 'min'),
+        year_max=('year_max', 'max'),
+    )
+
+    sketches = pd.concat([previous['year_brand_price_sketches'], delta['year_brand_price_sketches']])
+    merged['year_brand_price_sketches'] = merge_sketches(sketches, by=('release_year', 'brand'))
+    # самое дешевое устройство в ячейке - минимум, тоже сливается без полного датасета
+    merged['pareto_cells'] = merge_pareto_cells(previous['pareto_cells'], delta['pareto_cells'])
+    return merged
+
+
+def brand_profile_table(profiles, device_counts):
+    # то, что страница производителей раньше считала фильтром по всему датасету для каждого бренда
+    popular_type = (
+        device_counts.sort_values('count', ascending=False, kind='stable')
+        .drop_duplicates('brand').set_index('brand')['device_type']
+    )
+    table = profiles.set_index('brand')
+    return pd.DataFrame({
+        'mean_price': table['price_sum'] / table['count'],
+        'popular_type': popular_type,
+        'year_min': table['year_min'],
+        'year_max': table['year_max'],
+    })
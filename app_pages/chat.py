@@ -0,0 +1,177 @@
+from datetime import datetime
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from data import load_data, get_data_version
+from task7 import get_model_uri
+from async_gpt import get_async_gpt_client, REQUEST_TIMEOUT_SECONDS
+from chat_cache import get_chat_cache, make_cache_key
+from chat_history import build_context, cap_history
+from singleflight import get_singleflight
+from admission import get_admission_scheduler, AdmissionRejected
+
+data_version = get_data_version()
+df = load_data(data_version)
+
+st.title("Yandex GPT")
+
+if 'chat_history' not in st.session_state:
+    st.session_state.chat_history = []
+
+if 'chat_summary' not in st.session_state:
+    st.session_state.chat_summary = ""
+
+if 'input_key' not in st.session_state:
+    st.session_state.input_key = 0
+
+def clear_chat_history():
+    st.session_state.chat_history = []
+    st.session_state.chat_summary = ""
+    st.session_state.input_key += 1
+    st.success("История очищена!")
+
+st.session_state.model =  "yandexgpt-lite"
+
+if st.button("Очистить историю", use_container_width=True):
+    clear_chat_history()
+
+chat_cache = get_chat_cache()
+with st.expander("Кэш ответов"):
+    st.checkbox("Не брать ответ из кэша", key="bypass_cache")
+    cache_stats = chat_cache.stats()
+    col_cache1, col_cache2, col_cache3 = st.columns(3)
+    with col_cache1:
+        st.metric("Попаданий в кэш", f"{cache_stats['hit_rate']:.0%}")
+    with col_cache2:
+        st.metric("Сэкономлено запросов", cache_stats['hits'])
+    with col_cache3:
+        st.metric("Ответов в кэше", cache_stats['entries'])
+
+
+# история и поле ввода - фрагмент: новый вопрос не перерисовывает остальную страницу
+@st.fragment
+def chat_panel():
+    if not st.session_state.chat_history:
+        st.info("пусто")
+    else:
+        for i, message in enumerate(st.session_state.chat_history):
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+                col_info1, col_info2 = st.columns([3, 1])
+                with col_info1:
+                    if "source" in message:
+                        st.caption(f"{message['source']}")
+                with col_info2:
+                    if "timestamp" in message:
+                        st.caption(f"{message['timestamp']}")
+    if st.session_state.get('chat_notice'):
+        st.warning(st.session_state.pop('chat_notice'))
+
+    question = st.text_area(
+        "Ваш вопрос:",
+        placeholder="Например: Как собрать игровой компьютер за 10000 рублей?",
+        height=100,
+        key=f"question_input_{st.session_state.input_key}"
+    )
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        if st.button("Yandex GPT", use_container_width=True, type="primary"):
+            timestamp = datetime.now().strftime("%H:%M:%S")
+
+            # последние реплики идут в промпт целиком в пределах бюджета токенов, остальное - в краткую сводку
+            recent_history, summary = build_context(
+                st.session_state.chat_history,
+                st.session_state.chat_summary
+            )
+
+            st.session_state.chat_history.append({
+                "role": "user",
+                "content": question,
+                "timestamp": timestamp
+            })
+            with st.chat_message("user"):
+                st.markdown(question)
+            try:
+                # sklearn для поиска справок нужен только когда задан вопрос, а не на первом рендере чата
+                from retrieval import build_retrieval_index, retrieve_context
+
+                # в промпт идут только несколько справок по датасету, подходящих к вопросу
+                retrieval_index = build_retrieval_index(df, data_version)
+                context = retrieve_context(retrieval_index, question)
+
+                response_source = f"Yandex GPT ({st.session_state.model})"
+                cache_key = make_cache_key(question, recent_history, get_model_uri(), context)
+                response = None if st.session_state.bypass_cache else chat_cache.get(cache_key)
+
+                with st.chat_message("assistant"):
+                    if response is not None:
+                        st.markdown(response)
+                        response_source += " · из кэша"
+                    else:
+                        streamed_here = []
+
+                        def ask_gpt():
+                            streamed_here.append(True)
+                            # ответ печатается по мере генерации, а не после полного ответа
+                            gpt_client = get_async_gpt_client()
+                            answer = st.write_stream(gpt_client.stream(question, recent_history, summary, context))
+                            chat_cache.put(cache_key, answer)
+                            return answer
+
+                        # вопрос к API встает в общую очередь: лимит на сессию и обход сессий по кругу
+                        scheduler = get_admission_scheduler()
+                        ticket = scheduler.submit(get_script_run_ctx().session_id)
+                        queue_status = st.empty()
+                        try:
+                            scheduler.wait(
+                                ticket,
+                                on_wait=lambda position: queue_status.info(f"Вы в очереди: {position}")
+                            )
+                            queue_status.empty()
+                            if st.session_state.bypass_cache:
+                                # просили свежий ответ - к чужому запросу не присоединяемся
+                                response = ask_gpt()
+                            else:
+                                # такой же вопрос уже задан в другой сессии - ждем его ответ вместо второго запроса;
+                                # ведущий сам ограничен REQUEST_TIMEOUT_SECONDS, ждем с запасом, чтобы на его
+                                # таймауте не повторить запрос, а получить его ошибку
+                                response = get_singleflight("chat").do(
+                                    cache_key, ask_gpt, timeout=2 * REQUEST_TIMEOUT_SECONDS
+                                )
+                        finally:
+                            scheduler.release(ticket)
+                        if not streamed_here:
+                            st.markdown(response)
+                            response_source += " · общий запрос"
+
+                st.session_state.chat_history.append({
+                    "role": "assistant",
+                    "content": response,
+                    "source": response_source,
+                    "timestamp": datetime.now().strftime("%H:%M:%S")
+                })
+                # в сессии храним ограниченное число сообщений, вытесненные уходят в сводку
+                st.session_state.chat_history, st.session_state.chat_summary = cap_history(
+                    st.session_state.chat_history,
+                    st.session_state.chat_summary
+                )
+                st.session_state.input_key += 1
+            except AdmissionRejected as e:
+                # предупреждение показываем уже после перезапуска страницы
+                st.session_state.chat_history.pop()
+                st.session_state.chat_notice = str(e)
+            except Exception as e:
+                st.error(f"Ошибка: {e}")
+            st.session_state.input_key += 1
+            # перезапускается только чат, остальная страница не пересчитывается;
+            # если фрагмент выполнялся в полном прогоне страницы (AppTest), так нельзя - перезапускаем все
+            try:
+                st.rerun(scope="fragment")
+            except StreamlitAPIException:
+                st.rerun()
+
+
+chat_panel()
@@ -0,0 +1,107 @@
+import streamlit as st
+import plotly.express as px
+
+from data import load_data, get_data_version
+from metrics import span
+from name_search import build_search_index, search_names, matching_rows
+from percentiles import (
+    build_percentile_index, device_percentiles, PERCENTILE_COLUMNS, PERCENTILE_COLUMN_NAMES, SEGMENT_COLUMNS,
+)
+
+data_version = get_data_version()
+df = load_data(data_version)
+percentile_index = build_percentile_index(df, data_version)
+
+st.title("Сравнение с рынком")
+st.markdown("Где устройство находится среди всех устройств датасета и среди своего сегмента (тип + форм-фактор).")
+
+sources = ["Устройство из датасета", "Своя конфигурация"]
+if 'last_prediction' in st.session_state:
+    sources.insert(1, "Последнее предсказание")
+source = st.radio("Что сравниваем:", sources, horizontal=True)
+
+config = None
+if source == "Устройство из датасета":
+    search_index = build_search_index(df, data_version)
+    query = st.text_input("Модель (например: Model 12):", key="comparison_model")
+    if query:
+        matches = search_names(search_index, query, columns=['model'])
+        if matches.empty:
+            st.info("Ничего похожего не нашлось")
+        else:
+            model = st.selectbox("Модель", options=matches['value'])
+            # у одной модели бывает несколько конфигураций, показываем первые
+            rows = matching_rows(search_index, 'model', [model])[:50]
+            devices = df.iloc[rows]
+            position = st.selectbox(
+                "Конфигурация",
+                options=range(len(devices)),
+                format_func=lambda i: f"{devices['brand'].iloc[i]} {devices['device_type'].iloc[i]} "
+                                      f"{devices['form_factor'].iloc[i]}, ${devices['price'].iloc[i]:,.0f}"
+            )
+            config = devices.iloc[position].to_dict()
+
+elif source == "Последнее предсказание":
+    config = dict(st.session_state['last_prediction'])
+    # в форме предсказания нет форм-фактора, без него сегмент - только тип устройства
+    form_factors = sorted(df.loc[df['device_type'] == config['device_type'], 'form_factor'].dropna().unique())
+    form_factor = st.selectbox("Форм-фактор", options=["Любой"] + form_factors)
+    if form_factor != "Любой":
+        config['form_factor'] = form_factor
+    st.caption(f"Предсказанная цена: ${config['price']:,.2f}")
+
+else:
+    col1, col2 = st.columns(2)
+    config = {}
+    with col1:
+        config['device_type'] = st.selectbox("Тип устройства", options=sorted(df['device_type'].unique()))
+        config['form_factor'] = st.selectbox(
+            "Форм-фактор",
+            options=sorted(df.loc[df['device_type'] == config['device_type'], 'form_factor'].dropna().unique())
+        )
+    with col2:
+        for col in PERCENTILE_COLUMNS:
+            config[col] = st.number_input(PERCENTILE_COLUMN_NAMES[col], value=float(df[col].median()))
+
+if config:
+    with span("aggregation", page="comparison"):
+        result = device_percentiles(percentile_index, config)
+
+    segment = " ".join(str(config[col]) for col in SEGMENT_COLUMNS if col in config)
+    st.subheader(f"Сегмент: {segment}")
+
+    market = result.set_index('column')['market']
+    col_price, col_ram = st.columns(2)
+    if 'price' in market:
+        col_price.metric("Дороже, чем", f"{market['price']:.0f}% рынка")
+    if 'ram_gb' in market:
+        col_ram.metric("ОЗУ больше, чем", f"{market['ram_gb']:.0f}% рынка")
+
+    chart_data = result.melt(
+        id_vars=['column', 'value'], value_vars=['market', 'segment'], var_name='scope', value_name='percentile'
+    )
+    chart_data['column'] = chart_data['column'].map(PERCENTILE_COLUMN_NAMES)
+    chart_data['scope'] = chart_data['scope'].map({'market': 'Весь рынок', 'segment': 'Сегмент'})
+    fig = px.bar(
+        chart_data,
+        x='percentile',
+        y='column',
+        color='scope',
+        barmode='group',
+        orientation='h',
+        range_x=[0, 100],
+        title='Перцентиль характеристик',
+        labels={'percentile': 'Перцентиль', 'column': '', 'scope': ''},
+        hover_data={'value': True}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        result.assign(column=result['column'].map(PERCENTILE_COLUMN_NAMES)).rename(columns={
+            'column': 'Характеристика', 'value': 'Значение', 'market': 'Перцентиль на рынке',
+            'segment': 'Перцентиль в сегменте'
+        }).round(1),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption("Перцентиль - доля устройств с меньшим значением (равные считаются наполовину).")
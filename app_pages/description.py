@@ -0,0 +1,42 @@
+import streamlit as st
+
+from data import load_data
+
+df = load_data()
+
+st.title("Анализ рынка компьютерной техники")
+
+st.markdown("""
+Это интерактивное веб-приложение для анализа датасета цен на компьютерную технику. 
+Приложение позволяет исследовать различные аспекты рынка компьютеров, включая:
+
+- Статистический анализ
+- Временные тренды
+- Карта штаб квартир
+- Работа с моделью
+- ИИ-помощник
+""")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.image("https://img.freepik.com/premium-photo/business-analyst-financial-adviser-cat-working-generative-ai_842983-381.jpg",
+             caption="Рисунок 1: Котик анализирует рынок компьютероа")
+
+with col2:
+    st.image("https://www.itbestsellers.ru/etc/Logo/532652.png",
+             caption="Рисунок 2: Тренды цен 2024 в РФ")
+
+st.markdown("""
+### Пример данных в датасете
+""")
+
+st.dataframe(df.head(), use_container_width=True)
+
+st.markdown("""
+### Технологии
+- Streamlit 
+- Pandas 
+- Plotly 
+- Scikit-learn
+""")
@@ -0,0 +1,163 @@
+import streamlit as st
+
+from data import load_aggregate, has_aggregate, load_snapshot, load_data, read_manifest
+from metrics import span
+from price_sketch import merge_sketches, price_trend, sketch_quantiles, exact_price_trend, EXACT_SCAN_ROWS
+from task3 import draw_plot, draw_price_trend, dynamics_defaults, select_years_brands
+
+# страница строится по готовым счетчикам (год, бренд) из prepare_data.py, а не по всему датасету
+yearly_counts = load_aggregate('year_brand_counts')
+# цены - скетчи квантилей на ячейку (год, бренд), любая выборка получается их слиянием
+price_sketches = load_aggregate('year_brand_price_sketches') if has_aggregate('year_brand_price_sketches') else None
+# на маленьком датасете точный пересчет по строкам быстрее слияния скетчей
+exact_prices = price_sketches is not None and read_manifest().get('rows', EXACT_SCAN_ROWS) < EXACT_SCAN_ROWS
+defaults = dynamics_defaults(yearly_counts)
+
+st.title("Динамика выпуска моделей по годам")
+
+st.markdown("""
+### Анализ временных трендов
+""")
+
+st.subheader("Настройка интервала")
+
+col1, col2, col3 = st.columns([1, 1, 2])
+
+with col1:
+    st.markdown("От")
+    use_min_year = st.checkbox("Задать минимальный год", value=True)
+    if use_min_year:
+        min_year = st.number_input(
+            "от",
+            min_value=int(yearly_counts['release_year'].min()),
+            max_value=int(yearly_counts['release_year'].max()),
+            value=defaults['min_year'],
+            key="min_year"
+        )
+    else:
+        min_year = yearly_counts['release_year'].min()
+        st.info(f"Автоматически: {min_year}")
+
+with col2:
+    st.markdown("До")
+    use_max_year = st.checkbox("Задать максимальный год", value=True)
+    if use_max_year:
+        max_year = st.number_input(
+            "до",
+            min_value=int(yearly_counts['release_year'].min()),
+            max_value=int(yearly_counts['release_year'].max()),
+            value=defaults['max_year'],
+            key="max_year"
+        )
+    else:
+        max_year = yearly_counts['release_year'].max()
+        st.info(f"Автоматически: {max_year}")
+
+with col3:
+    st.markdown("Доп. настройки")
+
+    selected_brands = st.multiselect(
+        "Бренды",
+        options=sorted(yearly_counts['brand'].unique()),
+        default=defaults['brands']
+    )
+    chart_type = st.radio(
+        "Тип графика:",
+        ["Линейный", "Столбчатый"],
+        horizontal=True
+    )
+
+yearly_data = select_years_brands(yearly_counts, min_year, max_year, selected_brands)
+
+# вид по умолчанию у всех посетителей одинаковый - его графики берем из снимка render_snapshots.py,
+# живой расчет только если что-то поменяли
+view = {'min_year': min_year, 'max_year': max_year, 'brands': selected_brands, 'chart_type': chart_type}
+snapshot = load_snapshot('dynamics') if use_min_year and use_max_year and view == defaults else None
+figures = snapshot['figures'] if snapshot else {}
+
+if not selected_brands:
+    st.info("Надо выбрать производителя")
+else:
+    if price_sketches is None:
+        draw_plot(yearly_data, min_year, max_year, chart_type, fig=figures.get('counts'))
+        st.info("Для графика цен пересоберите данные: python prepare_data.py --force")
+    else:
+        if exact_prices:
+            selected_rows = select_years_brands(load_data(), min_year, max_year, selected_brands)
+        else:
+            selected_sketches = select_years_brands(price_sketches, min_year, max_year, selected_brands)
+        if 'price_trend' in figures:
+            price_trend_data = None
+            overall_median = snapshot['overall_median']
+        else:
+            with span("aggregation", page="dynamics"):
+                if exact_prices:
+                    price_trend_data = exact_price_trend(selected_rows)
+                    overall_median = selected_rows['price'].median()
+                else:
+                    price_trend_data = price_trend(selected_sketches)
+                    overall_median, = sketch_quantiles(merge_sketches(selected_sketches), [0.5])
+
+        col_count, col_price = st.columns(2)
+        with col_count:
+            draw_plot(yearly_data, min_year, max_year, chart_type, fig=figures.get('counts'))
+        with col_price:
+            draw_price_trend(price_trend_data, min_year, max_year, fig=figures.get('price_trend'))
+            accuracy = "" if exact_prices and 'price_trend' not in figures else " (точность ±1%)"
+            st.caption(f"Медианная цена по всей выборке: ${overall_median:,.0f}{accuracy}")
+    st.subheader(f"Статистика от {min_year} до {max_year}")
+
+    col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+
+    total_models = yearly_data['count'].sum()
+    unique_brands = yearly_data['brand'].nunique()
+    avg_models_per_year = yearly_data.groupby('release_year')['count'].sum().mean()
+    most_productive_year = yearly_data.groupby('release_year')['count'].sum().idxmax()
+
+    with col_stat1:
+        st.metric("Всего моделей", f"{total_models:,}")
+
+    with col_stat2:
+        st.metric("Производителей", unique_brands)
+
+    with col_stat3:
+        st.metric("Среднее в год", f"{avg_models_per_year:.1f}")
+
+    with col_stat4:
+        st.metric("Максимальный год", most_productive_year)
+
+    with st.expander("Детали"):
+        pivot_table = yearly_data.pivot_table(
+            index='brand',
+            columns='release_year',
+            values='count',
+            fill_value=0
+        ).astype(int)
+
+        pivot_table['Всего'] = pivot_table.sum(axis=1)
+        pivot_table.loc['Всего'] = pivot_table.sum()
+
+        st.dataframe(pivot_table, use_container_width=True)
+
+        if price_sketches is not None:
+            st.markdown("Медианная цена, $")
+            if exact_prices:
+                brand_trend = exact_price_trend(selected_rows, by=('release_year', 'brand'))
+            else:
+                brand_trend = price_trend(selected_sketches, by=('release_year', 'brand'))
+            st.dataframe(
+                brand_trend.pivot_table(index='brand', columns='release_year', values='median').round(0),
+                use_container_width=True
+            )
+    st.markdown("---")
+    with st.expander("Показать код"):
+        with open("task3.py", "r", encoding="utf8") as file:
+            code = file.read()
+        st.markdown("### Код построения графика")
+        st.code(code, language='python')
+
+    st.markdown("---")
+    st.markdown("Информация о выбранных данных:")
+    st.write(f"- Общий период в датасете: {int(yearly_data['release_year'].min())}-{int(yearly_data['release_year'].max())}")
+    st.write(f"- Уникальных брендов: {yearly_data['brand'].nunique()}")
+    st.write(f"- Моделей в датасете: {total_models:,}")
@@ -0,0 +1,49 @@
+import streamlit as st
+
+from aggregates import build_brand_profiles, brand_profile_table, count_values
+from data import load_data, load_aggregate, has_aggregate
+from task5 import build_map
+
+df = load_data()
+
+st.title("Производители и их штаб-квартиры")
+
+st.markdown("""
+### Карта
+""")
+
+st.subheader("Производители в датасете")
+unique_brands = df['brand'].unique()
+brands_count = len(unique_brands)
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    st.success(f"Всего уникальных производителей в датасете: {brands_count}")
+
+    brands_per_row = 4
+    brands_rows = [unique_brands[i:i + brands_per_row] for i in range(0, len(unique_brands), brands_per_row)]
+
+    for row in brands_rows:
+        cols = st.columns(brands_per_row)
+        for i, brand in enumerate(row):
+            with cols[i]:
+                st.info(f"{brand}")
+
+with col2:
+    brand_stats = load_aggregate('brand_counts').set_index('brand')['count']
+    top_5_brands = brand_stats.head(5)
+
+    st.metric("Самый популярный", top_5_brands.index[0])
+    st.metric(f"Устройств у {top_5_brands.index[0]}", top_5_brands.iloc[0])
+    st.metric("Всего устройств", len(df))
+# профили брендов готовит prepare_data.py и дополняет refresh_data.py, на старых данных считаем сами
+if has_aggregate('brand_profiles'):
+    brand_profiles = brand_profile_table(load_aggregate('brand_profiles'), load_aggregate('brand_device_counts'))
+else:
+    brand_profiles = brand_profile_table(build_brand_profiles(df), count_values(df, ['brand', 'device_type']))
+build_map(unique_brands, brand_profiles, brand_stats)
+with st.expander("Показать код"):
+    with open("task5.py", "r", encoding="utf8") as file:
+        code = file.read()
+    st.markdown("### Код построения графика")
+    st.code(code, language='python')
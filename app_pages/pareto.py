@@ -0,0 +1,71 @@
+import streamlit as st
+import plotly.express as px
+
+from data import load_data, get_data_version
+from metrics import span
+from skyline import load_pareto_frontier, PARETO_SPECS
+
+SPEC_NAMES = {
+    'cpu_cores': 'Ядер процессора',
+    'ram_gb': 'ОЗУ, ГБ',
+    'storage_gb': 'Накопитель, ГБ',
+    'vram_gb': 'Видеопамять, ГБ',
+    'gpu_tier': 'Уровень видеокарты',
+}
+
+data_version = get_data_version()
+df = load_data(data_version)
+
+st.title("Лучшие конфигурации за свои деньги")
+st.markdown("""
+Граница Парето: устройства, для которых в датасете нет ни одного дешевле (или такого же по цене)
+с не худшими характеристиками. Все остальные проигрывают кому-то из этого списка.
+""")
+
+col1, col2, col3 = st.columns([1, 2, 2])
+with col1:
+    device_type = st.selectbox("Тип устройства", options=["Все"] + sorted(df['device_type'].unique()))
+with col2:
+    brands = st.multiselect("Бренды (пусто - все)", options=sorted(df['brand'].unique()))
+with col3:
+    specs = st.multiselect(
+        "Характеристики",
+        options=PARETO_SPECS,
+        default=PARETO_SPECS,
+        format_func=SPEC_NAMES.get
+    )
+
+if not specs:
+    st.info("Надо выбрать хотя бы одну характеристику")
+else:
+    with span("aggregation", page="pareto"):
+        frontier = load_pareto_frontier(
+            df, tuple(specs), None if device_type == "Все" else device_type, tuple(sorted(brands)), data_version
+        )
+
+    st.metric("Конфигураций на границе", len(frontier))
+    if frontier.empty:
+        st.warning("Нет данных")
+    else:
+        axis = st.selectbox("Характеристика на графике", options=specs, format_func=SPEC_NAMES.get)
+        fig = px.scatter(
+            frontier,
+            x='price',
+            y=axis,
+            color='brand',
+            symbol='device_type',
+            hover_data=['model'] + specs,
+            title='Цена против характеристики на границе Парето',
+            labels={'price': 'Цена, $', axis: SPEC_NAMES[axis], 'brand': 'Бренд', 'device_type': 'Тип'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.dataframe(
+            frontier[['brand', 'device_type', 'model'] + specs + ['price']].rename(columns={
+                'brand': 'Бренд', 'device_type': 'Тип', 'model': 'Самая дешевая модель', 'price': 'Цена, $',
+                **SPEC_NAMES
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("Для каждой комбинации характеристик в бренде и типе показана самая дешевая модель.")
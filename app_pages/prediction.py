@@ -0,0 +1,255 @@
+import streamlit as st
+import pandas as pd
+
+from data import load_data, get_data_version
+from metrics import span, cache_request
+from task6 import load_price_model, load_price_forest, encode_features
+from forest_arrays import predict_forest_interval
+from neighbors import build_similar_index, find_similar_devices
+from name_search import build_search_index, search_names, matching_rows, SEARCH_COLUMN_NAMES
+from segments import load_segments, assign_segments
+
+data_version = get_data_version()
+df = load_data(data_version)
+
+st.title("Предсказание цен на компьютеры")
+
+cache_request("price_model")
+model_data = load_price_model(df)
+if model_data:
+    st.subheader("Метрики модели")
+
+    col_metric1, col_metric2, col_metric3 = st.columns(3)
+
+    with col_metric1:
+        st.metric(
+            "Средняя абсолютная ошибка",
+            f"${model_data['metrics']['mae']:.2f}"
+        )
+
+    with col_metric2:
+        # так себе моделька вышла, но для теста сойдет
+        st.metric(
+            "R^2 Score",
+            f"{model_data['metrics']['r2']:.3f}"
+        )
+
+    with col_metric3:
+        st.metric(
+            "Обучено на",
+            f"{len(df):,}"
+        )
+
+    with st.expander("Важность характеристик в модели"):
+        importances = model_data['feature_importances']
+        sorted_importances = dict(sorted(importances.items(), key=lambda x: x[1], reverse=True))
+
+        for feature, importance in sorted_importances.items():
+            feature_name = {
+                'brand': 'Бренд',
+                'device_type': 'Тип устройства',
+                'cpu_brand': 'Процессор',
+                'cpu_cores': 'Количество ядер',
+                'ram_gb': 'Оперативная память',
+                'storage_gb': 'Объем хранилища',
+                'gpu_brand': 'Видеокарта',
+                'display_size_in': 'Размер экрана'
+            }.get(feature, feature)
+
+            st.write(f"{feature_name}: {importance:.3f}")
+            st.progress(importance)
+
+    st.subheader("Предсказание цены")
+    st.markdown("Введите параметры компьютера для предсказания его стоимости:")
+
+    # форму можно заполнить типичной конфигурацией найденной модели, процессора или видеокарты
+    prefill = {}
+    lookup = st.text_input(
+        "Заполнить по названию (например: i7 13700, rtx4070):",
+        key="prediction_lookup"
+    )
+    if lookup:
+        search_index = build_search_index(df, data_version)
+        matches = search_names(search_index, lookup)
+        if matches.empty:
+            st.info("Ничего похожего не нашлось")
+        else:
+            choice = st.selectbox(
+                "Найдено",
+                options=range(len(matches)),
+                format_func=lambda i: f"{matches['value'][i]} ({SEARCH_COLUMN_NAMES[matches['column'][i]]}, "
+                                      f"{matches['devices'][i]:,} устр.)"
+            )
+            rows = matching_rows(search_index, matches['column'][choice], [matches['value'][choice]])
+            # самые частые значения среди (первой тысячи) устройств с этим названием
+            typical = df.iloc[rows[:1000]]
+            prefill = {col: typical[col].mode().iloc[0] for col in model_data['feature_columns']}
+
+    def default_index(options, col):
+        return options.index(prefill[col]) if prefill.get(col) in options else 0
+
+    with st.form("prediction_form"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            brand_options = sorted(df['brand'].unique())
+            brand = st.selectbox(
+                "Бренд",
+                options=brand_options,
+                index=default_index(brand_options, 'brand'),
+                help="Выберите производителя устройства"
+            )
+
+            device_type_options = sorted(df['device_type'].unique())
+            device_type = st.selectbox(
+                "Тип устройства",
+                options=device_type_options,
+                index=default_index(device_type_options, 'device_type'),
+                help="Выберите тип компьютерного устройства"
+            )
+
+            cpu_brand_options = sorted(df['cpu_brand'].unique())
+            cpu_brand = st.selectbox(
+                "Процессор",
+                options=cpu_brand_options,
+                index=default_index(cpu_brand_options, 'cpu_brand'),
+                help="Выберите производителя процессора"
+            )
+
+            gpu_brand_options = sorted(df['gpu_brand'].unique())
+            gpu_brand = st.selectbox(
+                "Видеокарта",
+                options=gpu_brand_options,
+                index=default_index(gpu_brand_options, 'gpu_brand'),
+                help="Выберите производителя видеокарты"
+            )
+
+        with col2:
+            cpu_cores = st.slider(
+                "Количество ядер процессора",
+                min_value=int(df['cpu_cores'].min()),
+                max_value=int(df['cpu_cores'].max()),
+                value=int(prefill.get('cpu_cores', 4)),
+                help="Выберите количество ядер процессора"
+            )
+
+            ram_gb = st.slider(
+                "Оперативная память (ГБ)",
+                min_value=int(df['ram_gb'].min()),
+                max_value=int(df['ram_gb'].max()),
+                value=int(prefill.get('ram_gb', 8)),
+                step=4,
+                help="Выберите объем оперативной памяти"
+            )
+
+            storage_gb = st.slider(
+                "Объем хранилища (ГБ)",
+                min_value=int(df['storage_gb'].min()),
+                max_value=int(df['storage_gb'].max()),
+                value=int(prefill.get('storage_gb', 512)),
+                step=128,
+                help="Выберите объем постоянной памяти"
+            )
+
+            screen_size = st.slider(
+                "Диагональ экрана (дюймы)",
+                min_value=float(df['display_size_in'].min()),
+                max_value=float(df['display_size_in'].max()),
+                value=float(prefill.get('display_size_in', 15.6)),
+                step=0.1,
+                help="Выберите размер экрана"
+            )
+
+        predict_button = st.form_submit_button(
+            "Предсказать цену",
+            use_container_width=True
+        )
+
+    if predict_button:
+        try:
+            input_data = {
+                'brand': brand,
+                'device_type': device_type,
+                'cpu_brand': cpu_brand,
+                'cpu_cores': cpu_cores,
+                'ram_gb': ram_gb,
+                'storage_gb': storage_gb,
+                'gpu_brand': gpu_brand,
+                'display_size_in': screen_size
+            }
+            input_df = encode_features(model_data, pd.DataFrame([input_data]))
+
+            with span("prediction", rows="single"):
+                forest = load_price_forest(model_data)
+                predictions, (low, high) = predict_forest_interval(forest, input_df)
+            prediction = predictions[0]
+            # страница сравнения с рынком предлагает последнее предсказание
+            st.session_state['last_prediction'] = {**input_data, 'price': float(prediction)}
+            st.success(f"###Предсказанная цена: ${prediction:,.2f}")
+            st.write(f"80% деревьев леса дают цену от ${low[0]:,.2f} до ${high[0]:,.2f}")
+
+            segments = load_segments(data_version, model_data)
+            if segments is not None:
+                segment = assign_segments(segments, pd.DataFrame([st.session_state['last_prediction']]))[0]
+                profile = segments['profiles'].set_index('segment').loc[segment]
+                st.write(f"Сегмент рынка {segment}: {profile['name']} (подробнее на странице сегментов)")
+
+            similar_index = build_similar_index(df, data_version)
+            similar_devices = find_similar_devices(
+                similar_index,
+                brand,
+                device_type,
+                {**input_data, 'price': prediction},
+                k=5
+            )
+
+            if similar_devices is not None:
+                avg_price_similar = similar_devices['price'].mean()
+                price_diff = prediction - avg_price_similar
+
+                st.write(f"Средняя цена похожих устройств: ${avg_price_similar:,.2f}")
+
+                if price_diff > 0:
+                    st.write(f"Устройство дороже на: ${price_diff:,.2f}")
+                else:
+                    st.write(f"Устройство дешевле на: ${abs(price_diff):,.2f}")
+
+                st.markdown("Ближайшие устройства в датасете:")
+                st.dataframe(
+                    pd.DataFrame(similar_devices).drop(columns='distance'),
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+        except Exception as e:
+            st.error(f"Ошибка при предсказании: {e}")
+
+    st.subheader("Пакетное предсказание")
+    st.markdown(f"CSV с колонками: {', '.join(model_data['feature_columns'])}")
+
+    batch_file = st.file_uploader("Файл с конфигурациями", type="csv")
+    if batch_file is not None:
+        try:
+            batch_df = pd.read_csv(batch_file)
+            missing = [col for col in model_data['feature_columns'] if col not in batch_df.columns]
+            if missing:
+                st.error(f"Не хватает колонок: {', '.join(missing)}")
+            else:
+                with span("prediction", rows="batch"):
+                    forest = load_price_forest(model_data)
+                    predictions, (low, high) = predict_forest_interval(forest, encode_features(model_data, batch_df))
+                batch_df['predicted_price'] = predictions
+                batch_df['price_p10'] = low
+                batch_df['price_p90'] = high
+
+                st.dataframe(batch_df, use_container_width=True)
+                st.download_button(
+                    "Скачать результат",
+                    batch_df.to_csv(index=False),
+                    file_name="predicted_prices.csv",
+                    mime="text/csv"
+                )
+        except Exception as e:
+            st.error(f"Ошибка при пакетном предсказании: {e}")
+else:
+    st.error("Брух")
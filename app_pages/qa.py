@@ -0,0 +1,182 @@
+import numpy as np
+import streamlit as st
+
+from data import load_data, get_data_version
+from metrics import span
+from name_search import build_search_index, search_names, matching_rows, SEARCH_COLUMNS, SEARCH_COLUMN_NAMES
+
+data_version = get_data_version()
+df = load_data(data_version)
+search_index = build_search_index(df, data_version)
+
+st.title("Вопрос-ответ по датасету")
+
+st.markdown("""
+### Форма для получения информации по датасету.
+""")
+
+
+# кнопки и фильтры перезапускают только свою колонку, а не всю страницу
+@st.fragment
+def frequent_questions():
+    st.subheader("Частые вопросы")
+    st.markdown("Тыкни что бы увидеть ответ")
+
+    if st.button("Сколько всего устройств в датасете?", key="q1"):
+        total_devices = len(df)
+        st.success(f"В датасете содержится {total_devices:,} устройств")
+
+    if st.button("Какие типы устройств представлены?", key="q2"):
+        device_types = df['device_type'].unique()
+        device_types_str = ", ".join(device_types)
+        st.success(f"Типы устройств: {device_types_str}")
+
+    if st.button("Какой диапазон цен?", key="q3"):
+        min_price = df['price'].min()
+        max_price = df['price'].max()
+        avg_price = df['price'].mean()
+        st.success(f"""
+        Диапазон цен:
+        - Мин цена: ${min_price:,.2f}
+        - Макс цена: ${max_price:,.2f}
+        - Средняя цена: ${avg_price:,.2f}
+        """)
+
+    if st.button("Какие бренды самые популярные?", key="q4"):
+        top_brands = df['brand'].value_counts().head(5)
+        st.success("Топ-5 самых популярных брендов:")
+        for brand, count in top_brands.items():
+            st.write(f"- {brand}: {count} устройств")
+
+
+@st.fragment
+def custom_query():
+    st.subheader("Еще запросики")
+    st.markdown("Тут можно настроить запрос")
+
+    st.markdown("Анализ по категориям")
+    analysis_type = st.radio(
+        "Тип анализа:",
+        ["По брендам", "По типам устройств", "По операционным системам"],
+        key="analysis_radio"
+    )
+
+    st.markdown("Фильтр по оперативной памяти")
+    min_ram = st.slider(
+        "Минимальный объем ОЗУ:",
+        min_value=int(df['ram_gb'].min()),
+        max_value=int(df['ram_gb'].max()),
+        value=8,
+        step=4,
+        key="ram_slider"
+    )
+
+    st.markdown("Поиск по процессору")
+    cpu_search = st.text_input(
+        "Введите название процессора (например: Intel, AMD, Ryzen, i7):",
+        placeholder="Intel i7",
+        key="cpu_input"
+    )
+
+    st.markdown("Фильтр по цене")
+    max_price_input = st.number_input(
+        "Максимальная цена:",
+        min_value=0,
+        max_value=int(df['price'].max()) + 1000,
+        value=2000,
+        step=100,
+        key="price_input"
+    )
+
+    if st.button("Применить фильтры и показать результаты", key="complex_filter"):
+        with st.spinner("Анализируем..."), span("aggregation", page="qa"):
+            filtered_data = df
+            if cpu_search:
+                # процессоры ищем по триграммному индексу, а не str.contains по всем строкам;
+                # это фильтр, поэтому в названии должны быть все триграммы запроса ("i7" не пускает i5 и i9),
+                # похожие названия только подсказываем
+                cpu_matches = search_names(
+                    search_index, cpu_search, columns=['cpu_model'], limit=None, min_score=1.0
+                )
+                if cpu_matches.empty:
+                    similar = search_names(search_index, cpu_search, columns=['cpu_model'], limit=5)['value']
+                    st.caption("Процессоры по запросу не найдены"
+                               + (f", похожие: {', '.join(similar)}" if len(similar) else ""))
+                else:
+                    st.caption(f"Процессоры по запросу: {', '.join(cpu_matches['value'])}")
+                filtered_data = df.iloc[matching_rows(search_index, 'cpu_model', cpu_matches['value'])]
+            filtered_data = filtered_data[filtered_data['ram_gb'] >= min_ram]
+            filtered_data = filtered_data[filtered_data['price'] <= max_price_input]
+            if analysis_type == "По брендам":
+                result = filtered_data['brand'].value_counts()
+                st.success(f"ОЗУ ≥ {min_ram}ГБ, цена ≤ ${max_price_input}:")
+                for brand, count in result.head(10).items():
+                    st.write(f"- {brand}: {count} устройств")
+
+            elif analysis_type == "По типам устройств":
+                result = filtered_data['device_type'].value_counts()
+                st.success(f"ОЗУ ≥ {min_ram}ГБ, цена ≤ ${max_price_input}")
+                for device_type, count in result.items():
+                    st.write(f"- {device_type}: {count} устройств")
+
+            else:
+                result = filtered_data['os'].value_counts()
+                st.success(f"ОЗУ ≥ {min_ram}ГБ, цена ≤ ${max_price_input}")
+                for os_name, count in result.items():
+                    st.write(f"- {os_name}: {count} устройств")
+
+            st.info(f"Всего найдно устройств: {len(filtered_data)}")
+            if len(filtered_data) > 0:
+                avg_price_filtered = filtered_data['price'].mean()
+                st.info(f"Средняя цена в выборке: ${avg_price_filtered:,.2f}")
+
+
+col1, col2 = st.columns([1, 1])
+
+with col1:
+    frequent_questions()
+
+with col2:
+    custom_query()
+
+
+@st.fragment
+def name_search():
+    st.subheader("Поиск по названию")
+    query = st.text_input(
+        "Модель, процессор или видеокарта (например: i7 13700, rtx4070):",
+        key="name_search_input"
+    )
+    columns = st.multiselect(
+        "Где искать",
+        options=SEARCH_COLUMNS,
+        default=SEARCH_COLUMNS,
+        format_func=SEARCH_COLUMN_NAMES.get,
+        key="name_search_columns"
+    )
+    if not query:
+        return
+
+    with span("aggregation", page="qa_search"):
+        matches = search_names(search_index, query, columns=columns, limit=10)
+        prices = df['price'].to_numpy()
+        matches['median_price'] = [
+            np.median(prices[matching_rows(search_index, col, [value])])
+            for col, value in zip(matches['column'], matches['value'])
+        ]
+    if matches.empty:
+        st.info("Ничего похожего не нашлось")
+        return
+
+    matches['column'] = matches['column'].map(SEARCH_COLUMN_NAMES)
+    st.dataframe(
+        matches.rename(columns={
+            'column': 'Где', 'value': 'Название', 'score': 'Совпадение',
+            'devices': 'Устройств', 'median_price': 'Медианная цена, $'
+        }).round({'Совпадение': 2, 'Медианная цена, $': 0}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+name_search()
@@ -0,0 +1,97 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from data import load_data, get_data_version
+from metrics import span, cache_request
+from segments import load_segments, assign_segments
+from task6 import load_price_model
+
+data_version = get_data_version()
+df = load_data(data_version)
+
+st.title("Сегменты рынка")
+st.markdown("""
+Устройства разбиты на сегменты кластеризацией (MiniBatchKMeans) по характеристикам и цене.
+Сегменты пересчитываются для каждой версии данных.
+""")
+
+cache_request("price_model")
+model_data = load_price_model(df)
+segments = load_segments(data_version, model_data)
+
+if segments is None:
+    st.info("Сегментов нет: сначала обучите модель цен, python prepare_data.py")
+    st.stop()
+
+profiles = segments['profiles']
+
+fig = px.scatter(
+    profiles,
+    x='price_median',
+    y='share',
+    size='devices',
+    color='device_type',
+    text='segment',
+    hover_data=['name', 'cpu_cores', 'ram_gb', 'storage_gb', 'gpu_brand'],
+    error_x=profiles['price_p90'] - profiles['price_median'],
+    error_x_minus=profiles['price_median'] - profiles['price_p10'],
+    title='Сегменты: медианная цена (усы - от P10 до P90) и доля рынка',
+    labels={'price_median': 'Медианная цена, $', 'share': 'Доля устройств', 'device_type': 'Тип'}
+)
+fig.update_traces(textposition='top center')
+st.plotly_chart(fig, use_container_width=True)
+
+st.subheader("Профили сегментов")
+st.dataframe(
+    profiles.assign(
+        share=(profiles['share'] * 100).round(1),
+        price_band=[f"${low:,.0f} - ${high:,.0f}" for low, high in zip(profiles['price_p10'], profiles['price_p90'])],
+        price_median=profiles['price_median'].round(0),
+    )[['segment', 'name', 'devices', 'share', 'device_type', 'cpu_cores', 'ram_gb', 'storage_gb',
+       'display_size_in', 'gpu_brand', 'brand', 'price_median', 'price_band']].rename(columns={
+        'segment': 'Сегмент', 'name': 'Описание', 'devices': 'Устройств', 'share': 'Доля, %',
+        'device_type': 'Тип', 'cpu_cores': 'Ядер', 'ram_gb': 'ОЗУ, ГБ', 'storage_gb': 'Накопитель, ГБ',
+        'display_size_in': 'Экран', 'gpu_brand': 'Видеокарта', 'brand': 'Частый бренд',
+        'price_median': 'Медиана, $', 'price_band': 'Цены P10-P90',
+    }),
+    use_container_width=True,
+    hide_index=True
+)
+st.caption("Характеристики сегмента - самые частые значения в нем.")
+
+st.subheader("В какой сегмент попадает конфигурация")
+
+last_prediction = st.session_state.get('last_prediction')
+use_prediction = last_prediction is not None and st.checkbox("Взять последнее предсказание", value=True)
+
+if use_prediction:
+    config = dict(last_prediction)
+    st.caption(f"Предсказанная цена: ${config['price']:,.2f}")
+else:
+    with st.form("segment_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            config = {
+                'brand': st.selectbox("Бренд", options=sorted(df['brand'].unique())),
+                'device_type': st.selectbox("Тип устройства", options=sorted(df['device_type'].unique())),
+                'cpu_brand': st.selectbox("Процессор", options=sorted(df['cpu_brand'].unique())),
+                'gpu_brand': st.selectbox("Видеокарта", options=sorted(df['gpu_brand'].unique())),
+            }
+        with col2:
+            config['cpu_cores'] = st.number_input("Ядер процессора", min_value=1, value=8)
+            config['ram_gb'] = st.number_input("ОЗУ, ГБ", min_value=1, value=16)
+            config['storage_gb'] = st.number_input("Накопитель, ГБ", min_value=1, value=512)
+            config['display_size_in'] = st.number_input("Диагональ экрана", min_value=1.0, value=15.6)
+            config['price'] = st.number_input("Цена, $", min_value=1.0, value=float(df['price'].median()))
+        st.form_submit_button("Определить сегмент")
+
+with span("prediction", rows="segment"):
+    segment = assign_segments(segments, pd.DataFrame([config]))[0]
+profile = profiles.set_index('segment').loc[segment]
+
+st.success(f"Сегмент {segment}: {profile['name']}")
+col_share, col_median, col_band = st.columns(3)
+col_share.metric("Доля рынка", f"{profile['share'] * 100:.1f}%")
+col_median.metric("Медианная цена сегмента", f"${profile['price_median']:,.0f}")
+col_band.metric("Цены P10-P90", f"${profile['price_p10']:,.0f} - ${profile['price_p90']:,.0f}")
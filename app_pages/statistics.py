@@ -0,0 +1,158 @@
+import streamlit as st
+
+from data import load_data, load_snapshot
+from metrics import span
+from statistics_charts import STATISTICS_CHARTS
+
+# страница без параметров одинакова для всех: если render_snapshots.py уже отрисовал ее для текущей
+# версии данных, берем готовые фигуры, а датасет даже не загружаем
+snapshot = load_snapshot('statistics')
+if snapshot:
+    rows, columns = snapshot['rows'], snapshot['columns']
+else:
+    df = load_data()
+    rows, columns = len(df), list(df.columns)
+
+
+def show_chart(key):
+    if snapshot and key in snapshot['figures']:
+        fig = snapshot['figures'][key]
+    else:
+        with span("figure", chart=key):
+            fig = STATISTICS_CHARTS[key](load_data())
+    st.plotly_chart(fig, use_container_width=True)
+
+
+st.title("📊 Общая статистика датасета")
+tab1, tab2, tab3, tab4 = st.tabs(
+    ["Основные характеристики", "Процессоры и память", "Графика и дисплеи", "Цены и гарантии"])
+with tab1:
+    st.subheader("Основные характеристики устройств")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        show_chart('device_type')
+
+    with col2:
+        show_chart('brand')
+
+    col3, col4 = st.columns(2)
+
+    with col3:
+        show_chart('os')
+
+    with col4:
+        show_chart('form_factor')
+
+with tab2:
+    st.subheader("Процессоры и память")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        show_chart('cpu_brand')
+
+    with col2:
+        show_chart('cpu_tier')
+
+    with col3:
+        show_chart('cpu_cores')
+
+    col4, col5 = st.columns(2)
+
+    with col4:
+        show_chart('ram_gb')
+
+    with col5:
+        show_chart('storage_type')
+
+    col6, col7 = st.columns(2)
+
+    with col6:
+        if 'storage_gb' in columns:
+            show_chart('storage_gb')
+
+    with col7:
+        if 'storage_drive_count' in columns:
+            show_chart('storage_drive_count')
+
+with tab3:
+    st.subheader("Графика и дисплеи")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        show_chart('gpu_brand')
+
+    with col2:
+        show_chart('gpu_tier')
+
+    with col3:
+        if 'vram_gb' in columns:
+            show_chart('vram_gb')
+
+    col4, col5 = st.columns(2)
+
+    with col4:
+        if 'display_type' in columns:
+            show_chart('display_type')
+
+    with col5:
+        if 'display_size_in' in columns:
+            show_chart('display_size_in')
+
+    col6, col7 = st.columns(2)
+
+    with col6:
+        if 'resolution' in columns:
+            show_chart('resolution')
+
+    with col7:
+        if 'refresh_hz' in columns:
+            show_chart('refresh_hz')
+
+with tab4:
+    st.subheader("Цены, батареи и гарантии")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        show_chart('price')
+
+    with col2:
+        show_chart('price_by_brand')
+
+    col3, col4, col5 = st.columns(3)
+    with col3:
+        if 'battery_wh' in columns:
+            show_chart('battery_wh')
+
+    with col4:
+        if 'charger_watts' in columns:
+            show_chart('charger_watts')
+
+    with col5:
+        if 'psu_watts' in columns:
+            show_chart('psu_watts')
+
+    col6, col7 = st.columns(2)
+
+    with col6:
+        if 'weight_kg' in columns:
+            show_chart('weight_kg')
+
+    with col7:
+        if 'warranty_months' in columns:
+            show_chart('warranty_months')
+
+    col8, col9 = st.columns(2)
+
+    with col8:
+        if 'wifi' in columns:
+            show_chart('wifi')
+
+    with col9:
+        if 'bluetooth' in columns:
+            show_chart('bluetooth')
+
+with st.expander("Немного о данных"):
+    st.write(f"Всего устройств: {rows}")
+    st.write(f"Колонки с графиками: {len([col for col in columns if col != 'model'])} из {len(columns)}")
+    st.write("Не визуализированы: model (название модеоей разное у всех производителей)")
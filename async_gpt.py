@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+import os
+import queue
+import threading
+import time
+
+import httpx
+import streamlit as st
+
+import task7
+from metrics import span, observe
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GPT_MAX_CONCURRENCY", "16"))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("GPT_TIMEOUT", "120"))
+# пул соединений httpcore перебирает все соединения на каждое событие,
+# поэтому держим несколько маленьких пулов вместо одного большого
+CONNECTIONS_PER_POOL = 16
+
+_DONE = object()
+
+
+class AsyncGptClient:
+    # один event loop в фоновом потоке на весь процесс, сессии только ставят в него задачи
+    def __init__(self, max_concurrent=MAX_CONCURRENT_REQUESTS, timeout=REQUEST_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="gpt-event-loop", daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(max_concurrent), self.loop).result()
+
+    async def _setup(self, max_concurrent):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        pool_size = min(max_concurrent, CONNECTIONS_PER_POOL)
+        self.clients = [
+            httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=10),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            )
+            for _ in range(-(-max_concurrent // pool_size))
+        ]
+        self.next_client = itertools.cycle(self.clients).__next__
+
+    async def _complete(self, question, history, summary, context):
+        prompt = task7.build_prompt(question, history, summary=summary, context=context)
+        async with self.semaphore:
+            response = await self.next_client().post(task7.completion_url, headers=task7.get_headers(), json=prompt)
+        if response.status_code != 200:
+            raise Exception(f"API Error {response.status_code}: {response.text}")
+        return response.json()['result']['alternatives'][0]['message']['text']
+
+    async def _stream(self, question, history, summary, context, chunks):
+        prompt = task7.build_prompt(question, history, stream=True, summary=summary, context=context)
+        try:
+            async with self.semaphore:
+                async with self.next_client().stream(
+                        "POST", task7.completion_url, headers=task7.get_headers(), json=prompt
+                ) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        raise Exception(f"API Error {response.status_code}: {response.text}")
+
+                    received = ""
+                    async for line in response.aiter_lines():
+                        delta, received = task7.parse_stream_line(line, received)
+                        if delta:
+                            chunks.put(delta)
+        finally:
+            chunks.put(_DONE)
+
+    def _submit(self, coroutine, timeout):
+        return asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(coroutine, timeout or self.timeout), self.loop
+        )
+
+    def complete(self, question, history, summary=None, context=None, timeout=None):
+        future = self._submit(self._complete(question, history, summary, context), timeout)
+        try:
+            return future.result()
+        except Exception as e:
+            raise Exception(f"Yandex GPT error: {str(e) or type(e).__name__}")
+        finally:
+            future.cancel()
+
+    def stream(self, question, history, summary=None, context=None, timeout=None):
+        chunks = queue.Queue()
+        future = self._submit(self._stream(question, history, summary, context, chunks), timeout)
+        start = time.perf_counter()
+        try:
+            with span("llm", mode="async_stream"):
+                first = True
+                while True:
+                    chunk = chunks.get()
+                    if chunk is _DONE:
+                        break
+                    if first:
+                        observe("llm_first_token", time.perf_counter() - start)
+                        first = False
+                    yield chunk
+                future.result()
+        except Exception as e:
+            raise Exception(f"Yandex GPT error: {str(e) or type(e).__name__}")
+        finally:
+            # если пользователь ушел со страницы, streamlit закрывает генератор и запрос к API отменяется
+            future.cancel()
+
+
+@st.cache_resource
+def get_async_gpt_client():
+    return AsyncGptClient()
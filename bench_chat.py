@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from mock_yandex import start_mock
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def summarize(name, latencies, errors, elapsed, ttft=None):
+    result = {"name": name, "ok": len(latencies), "errors": errors, "elapsed": elapsed,
+              "throughput": len(latencies) / elapsed if elapsed else 0.0}
+    if latencies:
+        result.update(zip(["p50", "p95", "p99"], np.percentile(latencies, [50, 95, 99]).tolist()))
+    if ttft:
+        result["ttft_p50"], result["ttft_p95"] = np.percentile(ttft, [50, 95]).tolist()
+    return result
+
+
+def run_concurrent(call, requests_count, concurrency):
+    latencies, ttft, errors = [], [], []
+    counter = iter(range(requests_count))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                first = call(i, start)
+                latencies.append(time.perf_counter() - start)
+                if first is not None:
+                    ttft.append(first)
+            except Exception:
+                errors.append(i)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, ttft, len(errors), time.perf_counter() - start
+
+
+def bench_sync(requests_count, concurrency):
+    import task7
+
+    def call(i, start):
+        task7.get_yandex_gpt_openai_response(f"вопрос {i}", [])
+
+    return run_concurrent(call, requests_count, concurrency)
+
+
+def bench_stream(ask, requests_count, concurrency):
+    def call(i, start):
+        first = None
+        for _ in ask(f"вопрос {i}", []):
+            if first is None:
+                first = time.perf_counter() - start
+        return first
+
+    return run_concurrent(call, requests_count, concurrency)
+
+
+def bench_page(requests_count):
+    from streamlit.testing.v1 import AppTest
+
+    def call(i, start):
+        at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+        at.switch_page("app_pages/chat.py").run()
+        at.text_area[0].input(f"вопрос со страницы {i}").run()
+        start_click = time.perf_counter()
+        next(b for b in at.button if b.label == "Yandex GPT").click().run()
+        if at.exception or at.error:
+            raise Exception("страница вернула ошибку")
+        # считаем только обработку вопроса, без первого рендера страницы
+        return time.perf_counter() - start_click
+
+    # AppTest не умеет создаваться из нескольких потоков сразу, поэтому страница гоняется по одной сессии;
+    # run_concurrent собирает возвращенное значение как "первый ответ", здесь это время обработки клика
+    _, click_times, errors, elapsed = run_concurrent(call, requests_count, 1)
+    return click_times, [], errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пути чата через локальную заглушку")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-requests", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="куда сохранить результаты")
+    args = parser.parse_args()
+
+    server, completion_url, _ = start_mock(
+        args.port,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate,
+    )
+    # окружение до импорта task7 и страницы: свой адрес API, пустой кэш ответов и без лимита на сессию
+    os.environ["YANDEX_GPT_URL"] = completion_url
+    os.environ["CHAT_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "chat_cache.sqlite3")
+    os.environ["GPT_SESSION_BURST"] = str(args.page_requests + 1)
+
+    import task7
+    from async_gpt import AsyncGptClient
+
+    client = AsyncGptClient()
+    results = []
+    latencies, _, errors, elapsed = bench_sync(args.requests, args.concurrency)
+    results.append(summarize("task7 sync", latencies, errors, elapsed))
+    latencies, ttft, errors, elapsed = bench_stream(task7.stream_yandex_gpt_response, args.requests, args.concurrency)
+    results.append(summarize("task7 stream", latencies, errors, elapsed, ttft))
+    latencies, ttft, errors, elapsed = bench_stream(client.stream, args.requests, args.concurrency)
+    results.append(summarize("async client stream", latencies, errors, elapsed, ttft))
+    if args.page_requests:
+        latencies, _, errors, elapsed = bench_page(args.page_requests)
+        results.append(summarize("chat page", latencies, errors, elapsed))
+
+    server.terminate()
+
+    print(f"{'путь':<22}{'ok':>5}{'ошибок':>8}{'p50, с':>8}{'p95, с':>8}{'p99, с':>8}"
+          f"{'TTFT p50':>10}{'запр/с':>8}")
+    for r in results:
+        print(f"{r['name']:<22}{r['ok']:>5}{r['errors']:>8}{r.get('p50', float('nan')):>8.2f}"
+              f"{r.get('p95', float('nan')):>8.2f}{r.get('p99', float('nan')):>8.2f}"
+              f"{r.get('ttft_p50', float('nan')):>10.2f}{r['throughput']:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "main.py")
+
+PAGES = {
+    "Описание проекта": "app_pages/description.py",
+    "Статистика": "app_pages/statistics.py",
+    "Динамика выпуска": "app_pages/dynamics.py",
+    "Вопрос-ответ": "app_pages/qa.py",
+    "Производители": "app_pages/manufacturers.py",
+    "Предсказание цен": "app_pages/prediction.py",
+    "Сравнение с рынком": "app_pages/comparison.py",
+    "Граница Парето": "app_pages/pareto.py",
+    "Сегменты рынка": "app_pages/segments_page.py",
+    "Чат с ИИ": "app_pages/chat.py",
+}
+
+
+def timed(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(times), "median_ms": float(np.median(times))}
+
+
+def bench_sections(df):
+    # те же вычисления, что на страницах, но без отрисовки - видно, сколько из времени страницы приходится на pandas
+    import pandas as pd
+    from data import load_aggregate, get_data_version
+    from aggregates import build_aggregates, STAT_COUNT_COLUMNS
+    from price_sketch import price_trend
+    from task6 import load_price_model, load_price_forest, encode_features
+    from forest_arrays import predict_forest_interval
+    from neighbors import build_similar_index, find_similar_devices
+    from name_search import build_search_index, search_names, matching_rows
+    from percentiles import build_percentile_index, device_percentiles
+    from skyline import build_pareto_cells, pareto_frontier
+    from segments import load_segments, assign_segments
+
+    def statistics_aggregates():
+        for col in STAT_COUNT_COLUMNS:
+            df[col].value_counts()
+        pd.cut(df['storage_gb'], bins=[0, 256, 512, 1024, 2048, float('inf')]).value_counts()
+        pd.cut(df['display_size_in'], bins=[0, 13, 15, 17, 24, float('inf')]).value_counts()
+        top_brands = df['brand'].value_counts().head(10).index
+        df[df['brand'].isin(top_brands)].groupby('brand')['price'].describe()
+
+    yearly_counts = load_aggregate('year_brand_counts')
+    brands = sorted(yearly_counts['brand'].unique())[:5]
+
+    def dynamics_filter():
+        yearly = yearly_counts[yearly_counts['release_year'].between(2018, 2025)]
+        yearly = yearly[yearly['brand'].isin(brands)]
+        yearly.groupby('release_year')['count'].sum().idxmax()
+        yearly.pivot_table(index='brand', columns='release_year', values='count', fill_value=0)
+
+    price_sketches = load_aggregate('year_brand_price_sketches')
+
+    def dynamics_price_trend():
+        selected = price_sketches[price_sketches['release_year'].between(2018, 2025)]
+        price_trend(selected[selected['brand'].isin(brands)])
+
+    def dynamics_price_rescan():
+        # то же без скетчей, для сравнения
+        selected = df[df['release_year'].between(2018, 2025) & df['brand'].isin(brands)]
+        selected.groupby('release_year')['price'].quantile([0.1, 0.5, 0.9])
+
+    def qa_filter():
+        filtered = df[(df['ram_gb'] >= 16) & (df['price'] <= 2000)]
+        filtered = filtered[filtered['cpu_model'].str.contains("i7", case=False, na=False)]
+        filtered['brand'].value_counts()
+        filtered['price'].mean()
+
+    search_index = build_search_index(df, get_data_version())
+
+    def qa_name_search():
+        for query in ("i7 13700", "rtx4070", "Model 44"):
+            matches = search_names(search_index, query)
+        matching_rows(search_index, 'cpu_model', search_names(search_index, "i7", columns=['cpu_model'])['value'])
+        return matches
+
+    pareto_cells = load_aggregate('pareto_cells')
+
+    def pareto():
+        pareto_frontier(pareto_cells)
+        pareto_frontier(pareto_cells, ['ram_gb', 'vram_gb'], 'Laptop', brands)
+
+    model_data = load_price_model(df)
+    forest = load_price_forest(model_data)
+    similar_index = build_similar_index(df, get_data_version())
+    config = df.iloc[0]
+    single = pd.DataFrame([config])
+    batch = df.sample(min(1000, len(df)), random_state=0)
+
+    def prediction_single():
+        predict_forest_interval(forest, encode_features(model_data, single).to_numpy())
+        find_similar_devices(similar_index, config['brand'], config['device_type'], config)
+
+    percentile_index = build_percentile_index(df, get_data_version())
+
+    def comparison_percentiles():
+        device_percentiles(percentile_index, config.to_dict())
+
+    def prediction_batch():
+        predict_forest_interval(forest, encode_features(model_data, batch).to_numpy())
+
+    segments = load_segments(get_data_version(), model_data)
+
+    def segments_assign():
+        assign_segments(segments, single)
+
+    def map_prep():
+        brand_stats = df['brand'].value_counts()
+        for brand in df['brand'].unique()[:10]:
+            brand_models = df[df['brand'] == brand]
+            brand_models['price'].mean()
+            brand_models['device_type'].mode()
+            brand_models['release_year'].agg(['min', 'max'])
+        return brand_stats
+
+    return {
+        "statistics aggregates": timed(statistics_aggregates),
+        "dynamics groupby (prepare)": timed(lambda: build_aggregates(df), repeat=1),
+        "dynamics filter": timed(dynamics_filter),
+        "dynamics price trend": timed(dynamics_price_trend),
+        "dynamics price rescan": timed(dynamics_price_rescan),
+        "qa filter": timed(qa_filter),
+        "qa name search": timed(qa_name_search),
+        "prediction single": timed(prediction_single),
+        "prediction batch 1000": timed(prediction_batch),
+        "comparison percentiles": timed(comparison_percentiles),
+        "pareto cells (prepare)": timed(lambda: build_pareto_cells(df), repeat=1),
+        "pareto frontier": timed(pareto),
+        "segments assign": timed(segments_assign),
+        "map prep": timed(map_prep),
+    }
+
+
+def bench_pages(pages):
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for title in pages:
+        at = AppTest.from_file(APP_PATH, default_timeout=600).run()
+        at.switch_page(PAGES[title])
+        start = time.perf_counter()
+        at.run()
+        cold = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        at.run()
+        warm = (time.perf_counter() - start) * 1000
+        results[title] = {
+            "cold_ms": cold,
+            "rerun_ms": warm,
+            "exceptions": [e.value for e in at.exception],
+        }
+    return results
+
+
+def run_worker(pages):
+    from data import load_prepared_dataset
+
+    start = time.perf_counter()
+    df = load_prepared_dataset()
+    load_ms = (time.perf_counter() - start) * 1000
+    result = {
+        "rows": len(df),
+        "load_parquet_ms": load_ms,
+    }
+    # страницы первыми, чтобы их холодный прогон не грелся кэшами из замеров участков
+    result["pages"] = bench_pages(pages)
+    result["sections"] = bench_sections(df)
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def prepare_size(label, work_dir, model_rows):
+    from synthetic_data import generate, load_source, parse_size
+
+    data_dir = os.path.join(work_dir, label)
+    csv_path = os.path.join(data_dir, "source.csv")
+    if not os.path.exists(csv_path):
+        print(f"[{label}] генерируем данные")
+        generate(parse_size(label), csv_path, load_source())
+    # prepare_data сам пропустит сборку, если CSV не менялся
+    subprocess.run(
+        [sys.executable, "prepare_data.py", "--csv", csv_path, "--model-rows", str(model_rows)],
+        cwd=APP_DIR, env={**os.environ, "DATA_DIR": data_dir}, check=True,
+    )
+    return data_dir
+
+
+def git_commit():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or "unknown"
+
+
+def print_results(results, baseline=None):
+    for label, result in results["sizes"].items():
+        base = (baseline or {}).get("sizes", {}).get(label, {})
+        print(f"\n{label}: {result['rows']:,} строк, чтение parquet {result['load_parquet_ms']:.0f} мс")
+        print(f"{'участок':<30}{'мс':>10}{'было':>10}")
+        rows = [(name, r["median_ms"], base.get("sections", {}).get(name, {}).get("median_ms"))
+                for name, r in result["sections"].items()]
+        rows += [(f"страница: {name}", r["cold_ms"], base.get("pages", {}).get(name, {}).get("cold_ms"))
+                 for name, r in result["pages"].items()]
+        for name, value, old in rows:
+            old_text = f"{old:>10.1f}" if old is not None else f"{'-':>10}"
+            print(f"{name:<30}{value:>10.1f}{old_text}")
+        for name, r in result["pages"].items():
+            if r["exceptions"]:
+                print(f"  {name}: {r['exceptions'][0][:120]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк страниц и вычислений на синтетических данных разного размера")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "1m", "10m"])
+    parser.add_argument("--pages", nargs="+", default=list(PAGES))
+    parser.add_argument("--work-dir", default="bench_data")
+    parser.add_argument("--model-rows", type=int, default=200_000)
+    parser.add_argument("--out", help="куда сохранить JSON, по умолчанию bench_results/<commit>.json")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.pages)
+        return
+
+    results = {"commit": git_commit(), "created": datetime.now().isoformat(timespec="seconds"), "sizes": {}}
+    for label in args.sizes:
+        data_dir = prepare_size(label, args.work_dir, args.model_rows)
+        # каждый размер в своем процессе: кэши streamlit и DATA_DIR живут на уровне процесса
+        worker = subprocess.run(
+            [sys.executable, __file__, "--worker", "--pages", *args.pages],
+            cwd=APP_DIR, capture_output=True, text=True,
+            env={**os.environ, "DATA_DIR": data_dir, "NOMINATIM_URL": "http://127.0.0.1:9/search"},
+        )
+        if worker.returncode != 0:
+            print(worker.stderr[-2000:])
+            raise SystemExit(f"[{label}] бенчмарк упал")
+        results["sizes"][label] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+    out = args.out or os.path.join("bench_results", f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f"\nРезультаты: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from load_test_sessions import HeadlessSession, start_server
+
+
+def memory_mb(pid):
+    # RSS считает страницы отображенных файлов в каждом процессе целиком, PSS делит их между процессами -
+    # сумма PSS по репликам и есть то, во что они обходятся хосту. anon - собственная куча процесса,
+    # file - отображенные файлы (Arrow-датасет, массивы леса, библиотеки), они живут в page cache один раз
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "anon": values["Anonymous"],
+        "file": values["Rss"] - values["Anonymous"],
+    }
+
+
+async def warm_up(port, pages):
+    # каждая реплика должна сама загрузить датасет, модель и индексы, как после живого трафика
+    session = HeadlessSession(port)
+    await session.connect()
+    for page in pages:
+        await session.rerun(page=page)
+    if "prediction" in pages:
+        await session.interact(lambda s: s.widget("button", "Предсказать цену").click())
+    session.close()
+
+
+def measure(replicas, base_port, env, pages):
+    servers = [start_server(base_port + i, env) for i in range(replicas)]
+    try:
+        for i in range(replicas):
+            asyncio.run(warm_up(base_port + i, pages))
+        time.sleep(1)
+        return [memory_mb(server.pid) for server in servers]
+    finally:
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Память на процесс при нескольких репликах streamlit на одном хосте")
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--modes", nargs="+", choices=["mmap", "parquet"], default=["mmap", "parquet"],
+                        help="mmap - общий Arrow-файл, parquet - своя копия датасета в каждом процессе")
+    parser.add_argument("--pages", nargs="+", default=["statistics", "dynamics", "qa", "prediction"],
+                        help="какие страницы открыть в каждой реплике перед замером")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("--json", help="куда сохранить результаты")
+    args = parser.parse_args()
+
+    env = {**os.environ, "NOMINATIM_URL": "http://127.0.0.1:9/search"}
+    results = []
+    print(f"{'режим':<9}{'реплик':>7}{'RSS/проц, МБ':>14}{'PSS/проц, МБ':>14}{'куча, МБ':>10}"
+          f"{'файлы, МБ':>11}{'PSS всего, МБ':>15}")
+    for mode in args.modes:
+        for replicas in args.replicas:
+            memory = measure(replicas, args.port, {**env, "DATASET_MMAP": "1" if mode == "mmap" else "0"}, args.pages)
+            row = {
+                "mode": mode,
+                "replicas": replicas,
+                **{f"{key}_mb": sum(m[key] for m in memory) / replicas for key in ("rss", "pss", "anon", "file")},
+                "pss_total_mb": sum(m["pss"] for m in memory),
+            }
+            results.append(row)
+            print(f"{mode:<9}{replicas:>7}{row['rss_mb']:>14.0f}{row['pss_mb']:>14.0f}{row['anon_mb']:>10.0f}"
+                  f"{row['file_mb']:>11.0f}{row['pss_total_mb']:>15.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
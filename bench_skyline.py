@@ -0,0 +1,69 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from skyline import skyline
+
+SHAPES = ['independent', 'correlated', 'anticorrelated']
+
+
+def make_points(shape, rows, dims, rng):
+    # классические наборы для скайлайна: независимые колонки, коррелированные (граница маленькая)
+    # и антикоррелированные (хорошее по одной колонке плохо по другим - граница большая)
+    if shape == 'independent':
+        return rng.random((rows, dims))
+    base = rng.random((rows, 1))
+    noise = 0.1 * rng.random((rows, dims))
+    if shape == 'correlated':
+        return base + noise
+    # антикорреляция: сумма колонок почти постоянна
+    split = rng.dirichlet(np.ones(dims), rows)
+    return split * (1 + 0.1 * base) + 0.01 * noise
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Скорость поиска границы Парето против полного перебора")
+    # на антикоррелированных данных почти все точки на границе, там любой алгоритм близок к n^2 - миллион не по умолчанию
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dims", type=int, nargs="+", default=[2, 3, 4, 6])
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    parser.add_argument("--brute-max", type=int, default=20_000, help="до скольки строк запускать O(n^2) перебор")
+    parser.add_argument("--json", help="куда сохранить результаты")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    results = []
+    print(f"{'набор':<16}{'строк':>10}{'колонок':>9}{'граница':>9}{'авто, мс':>11}{'sfs, мс':>10}{'перебор, мс':>13}")
+    for shape in args.shapes:
+        for rows in args.rows:
+            for dims in args.dims:
+                points = make_points(shape, rows, dims, rng)
+                auto, auto_ms = timed(lambda: skyline(points))
+                sfs, sfs_ms = timed(lambda: skyline(points, 'sfs'))
+                assert np.array_equal(auto, sfs), "2d/3d и sfs разошлись"
+                brute_ms = None
+                if rows <= args.brute_max:
+                    brute, brute_ms = timed(lambda: skyline(points, 'brute'))
+                    assert np.array_equal(auto, brute), "перебор нашел другую границу"
+
+                row = {"shape": shape, "rows": rows, "dims": dims, "frontier": len(auto),
+                       "auto_ms": auto_ms, "sfs_ms": sfs_ms, "brute_ms": brute_ms}
+                results.append(row)
+                brute_text = f"{brute_ms:>13.0f}" if brute_ms is not None else f"{'-':>13}"
+                print(f"{shape:<16}{rows:>10}{dims:>9}{len(auto):>9}{auto_ms:>11.0f}{sfs_ms:>10.0f}{brute_text}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from data import DATA_DIR
+from metrics import cache_request, cache_miss
+
+# рядом с данными, а не в корне репозитория
+CACHE_PATH = os.getenv("CHAT_CACHE_PATH", os.path.join(DATA_DIR, "chat_cache.sqlite3"))
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 5000
+# в ключ попадает только хвост истории, иначе одинаковые вопросы почти никогда не совпадут
+KEY_HISTORY_MESSAGES = 2
+KEY_HISTORY_CHARS = 200
+
+
+def normalize_question(question):
+    question = question.lower().replace('ё', 'е')
+    question = re.sub(r"[^\w\s$€₽.,]", " ", question)
+    return re.sub(r"\s+", " ", question).strip(" .,")
+
+
+def make_cache_key(question, history, model_uri, context=""):
+    short_history = [
+        [msg["role"], normalize_question(msg["content"])[:KEY_HISTORY_CHARS]]
+        for msg in history[-KEY_HISTORY_MESSAGES:]
+    ]
+    # справка из датасета тоже в ключе: после обновления данных старые ответы не подтянутся
+    raw = json.dumps([normalize_question(question), short_history, model_uri, context], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ChatCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, answer TEXT, created_at REAL, used_at REAL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS answers_used_at ON answers(used_at)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def _count(self, name):
+        self.connection.execute(
+            "INSERT INTO stats VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def get(self, key):
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT answer FROM answers WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            cache_request("chat_answers")
+            if row is None:
+                self._count("misses")
+                cache_miss("chat_answers")
+                return None
+            self.connection.execute("UPDATE answers SET used_at = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            return row[0]
+
+    def put(self, key, answer):
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)",
+                (key, answer, now, now)
+            )
+            self.connection.execute("DELETE FROM answers WHERE created_at <= ?", (now - self.ttl,))
+            # сверх лимита выкидываем то, что дольше всего не спрашивали
+            self.connection.execute(
+                "DELETE FROM answers WHERE key IN ("
+                "SELECT key FROM answers ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.connection.execute("SELECT name, value FROM stats").fetchall())
+            entries = self.connection.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": entries,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+@st.cache_resource
+def get_chat_cache():
+    return ChatCache()
@@ -0,0 +1,51 @@
+import re
+
+HISTORY_TOKEN_BUDGET = 1500
+SUMMARY_TOKEN_BUDGET = 300
+MAX_STORED_MESSAGES = 40
+SUMMARY_LINE_CHARS = 160
+
+ROLE_NAMES = {"user": "Пользователь", "assistant": "Ассистент"}
+
+
+def estimate_tokens(text):
+    # грубая оценка без токенизатора: для русского текста около 3 символов на токен
+    return len(text) // 3 + 1
+
+
+def summarize_message(message):
+    text = re.sub(r"\s+", " ", message["content"]).strip()
+    first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    return f"{ROLE_NAMES.get(message['role'], message['role'])}: {first_sentence}"
+
+
+def fold_into_summary(summary, messages, budget=SUMMARY_TOKEN_BUDGET):
+    lines = summary.splitlines() if summary else []
+    lines += [summarize_message(msg) for msg in messages if msg.get("content")]
+    # в сводке остаются самые свежие строки, которые влезают в бюджет
+    while lines and estimate_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def build_context(history, summary, budget=HISTORY_TOKEN_BUDGET):
+    recent = []
+    used = 0
+    for message in reversed(history):
+        tokens = estimate_tokens(message["content"])
+        if used + tokens > budget:
+            break
+        recent.insert(0, message)
+        used += tokens
+
+    older = history[:len(history) - len(recent)]
+    return recent, fold_into_summary(summary, older)
+
+
+def cap_history(history, summary, max_messages=MAX_STORED_MESSAGES):
+    if len(history) <= max_messages:
+        return history, summary
+    dropped = history[:-max_messages]
+    return history[-max_messages:], fold_into_summary(summary, dropped)
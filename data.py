@@ -0,0 +1,152 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import streamlit as st
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from metrics import span, cache_request, cache_miss
+
+# все, что готовит prepare_data.py, лежит в одной папке, приложение только читает манифест
+DATA_DIR = os.getenv("DATA_DIR", "1")
+MANIFEST_PATH = os.path.join(DATA_DIR, "manifest.json")
+# DATASET_MMAP=0 - читать parquet в память процесса, как раньше (для сравнения памяти)
+DATASET_MMAP = os.getenv("DATASET_MMAP", "1") == "1"
+
+
+def read_manifest(data_version=None):
+    with open(MANIFEST_PATH, encoding="utf8") as f:
+        manifest = json.load(f)
+    if data_version is None or str(manifest["version"]) == str(data_version):
+        return manifest
+    # манифест уже сменился, пока страница работала со своей версией: берем копию из папки версии,
+    # которую оставили prepare_data.py и refresh_data.py; в данных старого формата ее нет
+    path = os.path.join(DATA_DIR, f"v{data_version}", "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf8") as f:
+        return json.load(f)
+
+
+def data_ready():
+    return os.path.exists(MANIFEST_PATH)
+
+
+def open_arrow_dataset(path):
+    # файл отображается в память: страницы общие для всех процессов на хосте и лежат в page cache.
+    # split_blocks оставляет числовые колонки без пропусков видами на эти страницы без копии,
+    # строки остаются в arrow-буферах, а не превращаются в питоновские объекты
+    table = ipc.open_file(pa.memory_map(path, "r")).read_all()
+    arrow_strings = pd.StringDtype("pyarrow", na_value=np.nan)
+    return table.to_pandas(
+        split_blocks=True,
+        types_mapper={pa.string(): arrow_strings, pa.large_string(): arrow_strings}.get,
+    )
+
+
+def dataset_paths(manifest, arrow=False):
+    # файл из prepare_data.py и дописанные к нему refresh_data.py части с новыми строками
+    base = manifest["dataset_arrow"] if arrow else manifest["dataset"]
+    parts = [part["arrow" if arrow else "parquet"] for part in manifest.get("dataset_parts", [])]
+    return [os.path.join(DATA_DIR, path) for path in [base] + parts]
+
+
+def load_prepared_dataset(mmap=False, manifest=None):
+    manifest = manifest or read_manifest()
+    if mmap and "dataset_arrow" in manifest:
+        parts = [open_arrow_dataset(path) for path in dataset_paths(manifest, arrow=True)]
+    else:
+        parts = [pd.read_parquet(path) for path in dataset_paths(manifest)]
+    # с дописанными частями склейка - своя копия в памяти процесса;
+    # общий mmap возвращается, когда refresh_data.py уплотнит части в один файл
+    return parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+
+
+# cache_resource, а не cache_data: cache_data отдает каждому вызову свою копию через pickle,
+# а тут один и тот же DataFrame над mmap на все сессии; страницы его не меняют
+@st.cache_resource(max_entries=2)
+def read_dataset(data_version):
+    cache_miss("dataset")
+    try:
+        with span("data_load"):
+            # без копии манифеста версии читаем текущую: индексы тогда строятся по этому же df
+            manifest = read_manifest(data_version) or read_manifest()
+            return load_prepared_dataset(mmap=DATASET_MMAP, manifest=manifest)
+    except Exception as e:
+        st.error(f"Ошибка загрузки данных: {e}")
+        return pd.DataFrame()
+
+
+def load_data(data_version=None):
+    # страница читает версию один раз и передает ее сюда и в индексы, иначе обновление данных
+    # между двумя чтениями манифеста даст df одной версии и номера строк из индекса другой
+    cache_request("dataset")
+    return read_dataset(data_version or get_data_version())
+
+
+def get_data_version():
+    # версия из манифеста меняется при каждой новой подготовке данных, по ней сбрасываются кэши и индексы
+    return str(read_manifest()["version"])
+
+
+@st.cache_data(max_entries=8)
+def read_aggregate(name, data_version):
+    manifest = read_manifest(data_version) or read_manifest()
+    return pd.read_parquet(os.path.join(DATA_DIR, manifest["aggregates"][name]))
+
+
+def load_aggregate(name):
+    return read_aggregate(name, get_data_version())
+
+
+def has_aggregate(name):
+    # в данных, подготовленных старой версией prepare_data.py, новых агрегатов может не быть
+    return name in read_manifest().get("aggregates", {})
+
+
+def load_value_counts(col, df):
+    # счетчики готовит prepare_data.py и дополняет refresh_data.py, на старых данных считаем сами
+    if has_aggregate(f'{col}_counts'):
+        return load_aggregate(f'{col}_counts').set_index(col)['count']
+    return df[col].value_counts()
+
+
+def snapshot_path(name, manifest=None):
+    # снимки лежат в папке своей версии данных и уходят вместе с ней
+    manifest = manifest or read_manifest()
+    return os.path.join(DATA_DIR, f"v{manifest['version']}", "snapshots", f"{name}.json")
+
+
+@st.cache_resource(max_entries=8)
+def read_snapshot(name, data_version):
+    path = snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf8") as f:
+        snapshot = json.load(f)
+    # фигуры отдаются как есть; cache_resource, чтобы не копировать их на каждый запуск страницы
+    return snapshot if snapshot.get("version") == int(data_version) else None
+
+
+def load_snapshot(name):
+    return read_snapshot(name, get_data_version())
+
+
+def load_prepared_index(name, data_version):
+    # готовый индекс той же версии, что и датасет страницы; если его нет - страница построит индекс сама
+    manifest = read_manifest(data_version) or {}
+    path = manifest.get("indexes", {}).get(name)
+    if path is None or not os.path.exists(os.path.join(DATA_DIR, path)):
+        return None
+    with open(os.path.join(DATA_DIR, path), "rb") as f:
+        return pickle.load(f)
+
+
+# индексы поиска, похожих устройств, перцентилей и справок: по две версии данных на каждый
+@st.cache_resource(max_entries=8)
+def cached_prepared_index(name, _builder, _df, data_version):
+    # обычно индекс уже собран prepare_data.py, строим сами только если его там нет
+    return load_prepared_index(name, data_version) or _builder(_df)
@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+FOREST_ARRAYS = ['feature', 'threshold', 'missing_left', 'left', 'right', 'value', 'roots']
+
+
+def export_forest(model):
+    # все деревья подряд в одни массивы, индексы детей сдвигаются на начало своего дерева
+    features, thresholds, missing_lefts, lefts, rights, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        # куда идет NaN, sklearn решает при обучении для каждого узла
+        missing_lefts.append(tree.missing_go_to_left.astype(bool))
+        # лист ссылается сам на себя, поэтому обход не надо останавливать по каждой строке
+        own = np.arange(tree.node_count) + offset
+        lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+        rights.append(np.where(is_leaf, own, tree.children_right + offset))
+        values.append(tree.value[:, 0, 0])
+
+        offset += tree.node_count
+        depth = max(depth, tree.max_depth)
+
+    return {
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'missing_left': np.concatenate(missing_lefts),
+        'left': np.concatenate(lefts).astype(np.int32),
+        'right': np.concatenate(rights).astype(np.int32),
+        'value': np.concatenate(values).astype(np.float64),
+        'roots': np.array(roots, dtype=np.int32),
+        'depth': depth,
+    }
+
+
+def save_forest_arrays(arrays, path):
+    os.makedirs(path, exist_ok=True)
+    for name in FOREST_ARRAYS:
+        # новый файл подменяется через rename, старые mmap в работающих процессах остаются целыми
+        target = os.path.join(path, f"{name}.npy")
+        with open(target + ".tmp", "wb") as f:
+            np.save(f, arrays[name])
+        os.replace(target + ".tmp", target)
+    with open(os.path.join(path, "depth.txt"), "w") as f:
+        f.write(str(arrays['depth']))
+
+
+def load_forest_arrays(path):
+    # mmap: страницы подтягиваются с диска по мере обхода, старт почти мгновенный
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+        for name in FOREST_ARRAYS
+    }
+    with open(os.path.join(path, "depth.txt")) as f:
+        arrays['depth'] = int(f.read())
+    return arrays
+
+
+def forest_leaf_values(arrays, X):
+    # X приводится к float32, как в sklearn, иначе пороги сравниваются по-другому
+    X = np.asarray(X, dtype=np.float32).astype(np.float64)
+    rows = np.arange(len(X))[:, None]
+
+    node = np.broadcast_to(arrays['roots'], (len(X), len(arrays['roots']))).copy()
+    for _ in range(arrays['depth']):
+        x = X[rows, arrays['feature'][node]]
+        # NaN <= порог всегда False, поэтому пропуски направляем отдельно
+        go_left = np.where(np.isnan(x), arrays['missing_left'][node], x <= arrays['threshold'][node])
+        node = np.where(go_left, arrays['left'][node], arrays['right'][node])
+
+    return arrays['value'][node]
+
+
+def predict_forest(arrays, X):
+    return forest_leaf_values(arrays, X).mean(axis=1)
+
+
+def predict_forest_interval(arrays, X, quantiles=(10, 90)):
+    # один проход по деревьям: среднее дает точку, разброс листьев по деревьям дает интервал
+    leaf_values = forest_leaf_values(arrays, X)
+    bounds = np.percentile(leaf_values, quantiles, axis=1)
+    return leaf_values.mean(axis=1), bounds
+
+
+def with_missing(X, rows=100):
+    # к X добавляются копии первых строк с пропуском в каждой из колонок по очереди
+    sample = X.iloc[:rows]
+    parts = [X]
+    for col in X.columns:
+        part = sample.astype(float)
+        part[col] = np.nan
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def verify_forest_arrays(arrays, model, X):
+    X = with_missing(X)
+    expected = model.predict(X)
+    actual = predict_forest(arrays, X)
+    if not np.allclose(actual, expected, rtol=1e-9, atol=1e-6):
+        max_diff = np.abs(actual - expected).max()
+        raise ValueError(f"Плоский лес расходится с model.predict: {max_diff}")
+    return True
@@ -0,0 +1,70 @@
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from mock_yandex import start_mock
+
+
+def run_sessions(ask, sessions):
+    latencies = []
+    errors = []
+
+    def session(i):
+        start = time.perf_counter()
+        try:
+            "".join(ask(f"вопрос {i}", []))
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест чата на локальной заглушке")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    # ответ из 20 токенов за секунду, как у короткого ответа модели
+    server, completion_url, stats_url = start_mock(args.port, latency=0, tokens_per_second=20, answer_tokens=20)
+    os.environ["YANDEX_GPT_URL"] = completion_url
+
+    import requests
+    import task7
+    from async_gpt import AsyncGptClient
+
+    client = AsyncGptClient(max_concurrent=args.concurrency)
+    modes = {
+        "sync requests": task7.stream_yandex_gpt_response,
+        f"async, limit {args.concurrency}": client.stream,
+    }
+
+    print(f"{'режим':<20}{'сессий':>8}{'ошибок':>8}{'время, с':>10}{'сессий/с':>10}"
+          f"{'p50, с':>8}{'p95, с':>8}{'пик к API':>11}")
+    for sessions in args.sessions:
+        for name, ask in modes.items():
+            requests.get(stats_url)
+            elapsed, latencies, errors = run_sessions(ask, sessions)
+            peak = requests.get(stats_url).json()["peak_in_flight"]
+            p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (float('nan'),) * 2
+            print(f"{name:<20}{sessions:>8}{len(errors):>8}{elapsed:>10.2f}{len(latencies) / elapsed:>10.1f}"
+                  f"{p50:>8.2f}{p95:>8.2f}{peak:>11}")
+            for error in sorted({str(e) for e in errors}):
+                print(f"    {error}")
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
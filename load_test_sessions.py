@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import requests
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+from mock_yandex import start_mock
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class HeadlessSession:
+    # клиент websocket-протокола streamlit без браузера: шлет BackMsg, собирает ForwardMsg до конца прогона,
+    # а дерево элементов разбирает тем же кодом, что и AppTest
+    def __init__(self, port):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.pages = {}
+        self.page_hash = ""
+        self.tree = None
+        # как и браузер, помним последние отправленные значения виджетов; нетронутые сервер берет по умолчанию
+        self.widget_states = {}
+
+    async def connect(self):
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=256 << 20)
+        return await self.rerun()
+
+    async def rerun(self, widget_states=(), page=None):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = self.pages.get(page, self.page_hash)
+        msg.rerun_script.widget_states.widgets.extend(widget_states)
+
+        start = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        messages = []
+        while True:
+            data = await self.ws.read_message()
+            if data is None:
+                raise ConnectionError("сервер закрыл соединение")
+            forward = ForwardMsg.FromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                # каждый прогон скрипта (в том числе после st.rerun) начинается заново
+                messages = []
+            elif kind == "navigation":
+                # у страницы по умолчанию url_pathname пустой
+                self.pages = {p.url_pathname: p.page_script_hash for p in forward.navigation.app_pages}
+                if forward.navigation.page_script_hash != self.page_hash:
+                    self.widget_states = {}
+                self.page_hash = forward.navigation.page_script_hash
+            elif kind == "delta":
+                messages.append(forward)
+            elif kind == "script_finished" and \
+                    forward.script_finished != ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.tree = parse_tree_from_messages(messages)
+        if self.tree.exception:
+            raise RuntimeError(self.tree.exception[0].value)
+        return time.perf_counter() - start
+
+    def widget(self, kind, label):
+        found = [w for w in self.tree.get(kind) if w.label == label]
+        if not found:
+            raise LookupError(f"нет виджета {kind} «{label}»")
+        return found[0]
+
+    def choose(self, kind, label, value):
+        # radio и multiselect дерево AppTest сериализует через format_func из session_state,
+        # которого у внешнего клиента нет; опции тут строковые, поэтому состояние собираем сами
+        state = WidgetState(id=self.widget(kind, label).id)
+        if isinstance(value, list):
+            state.string_array_value.data[:] = value
+        else:
+            state.string_value = value
+        return state
+
+    async def interact(self, *changes):
+        triggers = []
+        for change in changes:
+            state = change(self)
+            if not isinstance(state, WidgetState):
+                state = state._widget_state
+            # нажатие кнопки браузер отправляет один раз, остальные значения держит
+            if state.WhichOneof("value") == "trigger_value":
+                triggers.append(state)
+            else:
+                self.widget_states[state.id] = state
+        return await self.rerun([*self.widget_states.values(), *triggers])
+
+    def close(self):
+        self.ws.close()
+
+
+def pick_last_brands(session):
+    return session.choose("multiselect", "Бренды", session.widget("multiselect", "Бренды").options[-3:])
+
+
+# сценарий одного пользователя: (действие, страница, изменения виджетов)
+SCENARIO = [
+    ("открыть описание", "", []),
+    ("открыть динамику", "dynamics", []),
+    ("динамика: тип графика", None, [lambda s: s.choose("radio", "Тип графика:", "Столбчатый")]),
+    ("динамика: бренды", None, [pick_last_brands]),
+    ("открыть вопрос-ответ", "qa", []),
+    ("вопрос-ответ: фильтр", None, [
+        lambda s: s.widget("slider", "Минимальный объем ОЗУ:").set_value(16),
+        lambda s: s.widget("button", "Применить фильтры и показать результаты").click(),
+    ]),
+    ("открыть предсказание", "prediction", []),
+    ("предсказание", None, [lambda s: s.widget("button", "Предсказать цену").click()]),
+    ("открыть чат", "chat", []),
+    ("чат: вопрос", None, [
+        lambda s: s.widget("text_area", "Ваш вопрос:").input(f"Какой ноутбук взять до ${random.randint(500, 3000)}?"),
+        lambda s: s.widget("button", "Yandex GPT").click(),
+    ]),
+]
+
+
+async def run_user(port, iterations, think_time, latencies, errors):
+    session = HeadlessSession(port)
+    try:
+        latencies.setdefault("подключение", []).append(await session.connect())
+        for _ in range(iterations):
+            for action, page, changes in SCENARIO:
+                try:
+                    if page is not None:
+                        elapsed = await session.rerun(page=page)
+                    else:
+                        elapsed = await session.interact(*changes)
+                    latencies.setdefault(action, []).append(elapsed)
+                except Exception as e:
+                    errors.append(f"{action}: {e}")
+                await asyncio.sleep(random.uniform(0, think_time))
+    except Exception as e:
+        errors.append(f"подключение: {e}")
+    return session
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+async def run_level(port, server_pid, users, iterations, think_time):
+    latencies, errors = {}, []
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*(run_user(port, iterations, think_time, latencies, errors) for _ in range(users)))
+    elapsed = time.perf_counter() - start
+    # память меряем, пока сессии еще подключены и держат свое состояние
+    rss = rss_mb(server_pid)
+    for session in sessions:
+        session.close()
+    return latencies, errors, elapsed, rss
+
+
+def start_server(port, env):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "main.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(120):
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return server
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    server.kill()
+    raise SystemExit("streamlit не поднялся")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузка из N одновременных сессий на локальный сервер streamlit")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--iterations", type=int, default=2, help="сколько раз каждая сессия проходит сценарий")
+    parser.add_argument("--think-time", type=float, default=0.5, help="пауза между действиями, до стольких секунд")
+    parser.add_argument("--port", type=int, default=8511)
+    parser.add_argument("--mock-port", type=int, default=8798)
+    parser.add_argument("--json", help="куда сохранить результаты")
+    args = parser.parse_args()
+
+    mock, completion_url, _ = start_mock(args.mock_port, latency=0.3, tokens_per_second=50, answer_tokens=40)
+    env = {
+        **os.environ,
+        "YANDEX_GPT_URL": completion_url,
+        "CHAT_CACHE_PATH": os.path.join(tempfile.mkdtemp(), "chat_cache.sqlite3"),
+        # лимит на сессию тут мешает: каждая сессия спрашивает чат на каждом круге
+        "GPT_SESSION_BURST": "1000",
+        "GPT_SESSION_RPM": "1000",
+        "NOMINATIM_URL": "http://127.0.0.1:9/search",
+    }
+    server = start_server(args.port, env)
+
+    results = []
+    try:
+        # прогрев: данные, модель и индексы загружаются один раз на процесс
+        _, errors, _, _ = asyncio.run(run_level(args.port, server.pid, 1, 1, 0))
+        if errors:
+            print("\n".join(errors[:5]))
+        time.sleep(2)
+        base_rss = rss_mb(server.pid)
+
+        print(f"{'сессий':>7}{'действий':>10}{'ошибок':>8}{'p50, с':>8}{'p95, с':>8}{'p99, с':>8}"
+              f"{'действий/с':>12}{'RSS, МБ':>9}{'МБ/сессию':>11}")
+        for users in args.users:
+            latencies, errors, elapsed, rss = asyncio.run(
+                run_level(args.port, server.pid, users, args.iterations, args.think_time))
+            values = [v for action in latencies.values() for v in action]
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) if values else (float("nan"),) * 3
+            result = {
+                "users": users,
+                "actions": len(values),
+                "errors": len(errors),
+                "p50": p50, "p95": p95, "p99": p99,
+                "throughput": len(values) / elapsed,
+                "rss_mb": rss,
+                "mb_per_session": (rss - base_rss) / users,
+                "by_action": {action: dict(zip(["p50", "p95"], np.percentile(v, [50, 95]).tolist()))
+                              for action, v in latencies.items()},
+            }
+            results.append(result)
+            print(f"{users:>7}{len(values):>10}{len(errors):>8}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}"
+                  f"{result['throughput']:>12.1f}{rss:>9.0f}{result['mb_per_session']:>11.1f}")
+            for error in sorted(set(errors))[:3]:
+                print(f"    {error}")
+            time.sleep(2)
+
+        print("\np95 по действиям, с:")
+        print(f"{'действие':<26}" + "".join(f"{r['users']:>8}" for r in results))
+        for action in results[-1]["by_action"]:
+            print(f"{action:<26}" + "".join(
+                f"{r['by_action'].get(action, {}).get('p95', float('nan')):>8.2f}" for r in results))
+    finally:
+        server.terminate()
+        mock.terminate()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
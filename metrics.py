@@ -0,0 +1,184 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE")
+METRICS_INTERVAL_SECONDS = float(os.getenv("METRICS_INTERVAL", "15"))
+# у каждой реплики свой файл и своя метка, иначе реплики затирают замеры друг друга
+METRICS_REPLICA = os.getenv("METRICS_REPLICA", str(os.getpid()))
+DEBUG_PANEL = os.getenv("APP_DEBUG_PANEL") == "1"
+
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+
+class Registry:
+    # общие на процесс таймеры и счетчики, ключ - имя и набор меток
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def observe(self, name, labels, seconds):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.timings.setdefault(key, _Timing()).observe(seconds)
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            timings = {key: (t.count, t.total, t.max, t.last, list(t.buckets)) for key, t in self.timings.items()}
+            return timings, dict(self.counters)
+
+
+REGISTRY = Registry()
+
+
+@contextmanager
+def span(name, **labels):
+    # работает и как with span("llm"):, и как декоратор @span("llm")
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, labels, time.perf_counter() - start)
+
+
+def observe(name, seconds, **labels):
+    REGISTRY.observe(name, labels, seconds)
+
+
+def count(name, value=1, **labels):
+    REGISTRY.inc(name, labels, value)
+
+
+def cache_request(cache):
+    count("cache_requests", cache=cache)
+
+
+def cache_miss(cache):
+    # вызывается внутри функции под st.cache_*, то есть только когда кэш не сработал
+    count("cache_misses", cache=cache)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = [("replica", METRICS_REPLICA)] + list(labels) + list(extra)
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    timings, counters = REGISTRY.snapshot()
+    lines = [
+        "# HELP app_span_seconds Время участков кода приложения",
+        "# TYPE app_span_seconds histogram",
+    ]
+    for (name, labels), (n, total, _, _, buckets) in sorted(timings.items()):
+        labels = (("span", name),) + labels
+        for bound, value in zip(BUCKETS, buckets):
+            lines.append(f"app_span_seconds_bucket{_format_labels(labels, [('le', bound)])} {value}")
+        lines.append(f"app_span_seconds_bucket{_format_labels(labels, [('le', '+Inf')])} {n}")
+        lines.append(f"app_span_seconds_sum{_format_labels(labels)} {total:.6f}")
+        lines.append(f"app_span_seconds_count{_format_labels(labels)} {n}")
+
+    names = sorted({name for name, _ in counters})
+    for name in names:
+        lines.append(f"# TYPE app_{name}_total counter")
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"app_{name}_total{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path):
+    # node exporter может прочитать файл в любой момент, поэтому пишем рядом и подменяем rename
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def replica_textfile(path):
+    # metrics.prom -> metrics.<реплика>.prom, node exporter читает все *.prom в папке
+    root, ext = os.path.splitext(path)
+    return f"{root}.{METRICS_REPLICA}{ext or '.prom'}"
+
+
+def _remove_textfile(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _export_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_textfile(path)
+        except OSError as e:
+            print(f"metrics export error: {e}")
+
+
+@st.cache_resource
+def start_metrics_export(path=METRICS_TEXTFILE, interval=METRICS_INTERVAL_SECONDS):
+    if not path:
+        return None
+    path = replica_textfile(path)
+    # файл остановленной реплики не должен висеть с последними значениями
+    atexit.register(_remove_textfile, path)
+    thread = threading.Thread(target=_export_loop, args=(path, interval), daemon=True)
+    thread.start()
+    return thread
+
+
+def render_debug_panel():
+    timings, counters = REGISTRY.snapshot()
+    with st.sidebar.expander("Отладка: замеры"):
+        rows = [
+            {
+                "участок": name + "".join(f" {k}={v}" for k, v in labels),
+                "вызовов": n,
+                "среднее, мс": round(total / n * 1000, 1),
+                "макс, мс": round(longest * 1000, 1),
+                "последний, мс": round(last * 1000, 1),
+            }
+            for (name, labels), (n, total, longest, last, _) in sorted(timings.items())
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+
+        for (name, labels), value in sorted(counters.items()):
+            if name != "cache_requests":
+                continue
+            misses = counters.get(("cache_misses", labels), 0)
+            cache = dict(labels).get("cache")
+            st.caption(f"кэш {cache}: {value} обращений, попаданий {(value - misses) / value:.0%}")
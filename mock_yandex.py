@@ -0,0 +1,157 @@
+import argparse
+import json
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETION_PATH = "/foundationModels/v1/completion"
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    # локальная замена foundationModels/v1/completion с настраиваемой задержкой, скоростью и ошибками
+    protocol_version = "HTTP/1.1"
+    latency = 0.3
+    tokens_per_second = 50.0
+    answer_tokens = 60
+    error_rate = 0.0
+    error_status = 500
+
+    lock = threading.Lock()
+    in_flight = 0
+    peak_in_flight = 0
+    requests_total = 0
+    errors_total = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, payload):
+        data = (json.dumps(payload, ensure_ascii=False) + "\n").encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        # /stats отдает счетчики и сбрасывает пик одновременных запросов
+        cls = type(self)
+        with cls.lock:
+            payload = {
+                "requests": cls.requests_total,
+                "errors": cls.errors_total,
+                "in_flight": cls.in_flight,
+                "peak_in_flight": cls.peak_in_flight,
+            }
+            cls.peak_in_flight = cls.in_flight
+        self._send_json(200, payload)
+
+    def do_POST(self):
+        cls = type(self)
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+        if self.path != COMPLETION_PATH:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        with cls.lock:
+            cls.requests_total += 1
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        try:
+            time.sleep(cls.latency)
+            if random.random() < cls.error_rate:
+                with cls.lock:
+                    cls.errors_total += 1
+                self._send_json(cls.error_status, {"error": {"httpCode": cls.error_status, "message": "injected error"}})
+                return
+
+            question = body.get("messages", [{}])[-1].get("text", "")
+            words = [f"ответ{i}" for i in range(cls.answer_tokens)]
+            words[:len(question.split())] = question.split()[:cls.answer_tokens]
+            usage = {
+                "inputTextTokens": str(sum(len(m.get("text", "")) // 3 for m in body.get("messages", []))),
+                "completionTokens": str(cls.answer_tokens),
+                "totalTokens": str(cls.answer_tokens),
+            }
+
+            if not body.get("completionOptions", {}).get("stream"):
+                time.sleep(cls.answer_tokens / cls.tokens_per_second)
+                self._send_json(200, {"result": {
+                    "alternatives": [{"message": {"role": "assistant", "text": " ".join(words)},
+                                      "status": "ALTERNATIVE_STATUS_FINAL"}],
+                    "usage": usage,
+                    "modelVersion": "mock",
+                }})
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(1, len(words) + 1):
+                time.sleep(1 / cls.tokens_per_second)
+                self._send_chunk({"result": {
+                    "alternatives": [{"message": {"role": "assistant", "text": " ".join(words[:i])},
+                                      "status": "ALTERNATIVE_STATUS_PARTIAL" if i < len(words)
+                                      else "ALTERNATIVE_STATUS_FINAL"}],
+                    "usage": usage,
+                    "modelVersion": "mock",
+                }})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # клиент отменил запрос
+            pass
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+def serve(port=8787, **settings):
+    handler = type("ConfiguredHandler", (MockCompletionHandler,), settings)
+    MockServer(("127.0.0.1", port), handler).serve_forever()
+
+
+def start_mock(port=8787, **settings):
+    # в отдельном процессе, чтобы заглушка не делила GIL с измеряемым клиентом
+    process = multiprocessing.Process(target=serve, args=(port,), kwargs=settings, daemon=True)
+    process.start()
+    time.sleep(0.5)
+    return process, f"http://127.0.0.1:{port}{COMPLETION_PATH}", f"http://127.0.0.1:{port}/stats"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная заглушка Yandex GPT completion API")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=MockCompletionHandler.latency,
+                        help="задержка до первого токена, с")
+    parser.add_argument("--tokens-per-second", type=float, default=MockCompletionHandler.tokens_per_second)
+    parser.add_argument("--answer-tokens", type=int, default=MockCompletionHandler.answer_tokens)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля запросов с ошибкой")
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"YANDEX_GPT_URL=http://127.0.0.1:{args.port}{COMPLETION_PATH}")
+    serve(
+        args.port,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+
+
+if __name__ == "__main__":
+    main()
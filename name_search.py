@@ -0,0 +1,177 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from data import cached_prepared_index
+
+SEARCH_COLUMNS = ['model', 'cpu_model', 'gpu_model']
+SEARCH_COLUMN_NAMES = {'model': 'Модель', 'cpu_model': 'Процессор', 'gpu_model': 'Видеокарта'}
+# доля триграмм запроса, которая должна найтись в названии
+MIN_SCORE = 0.5
+
+
+def normalize_name(text):
+    # "RTX 4070", "rtx4070" и "RTX-4070" должны совпадать, поэтому выкидываем все кроме букв и цифр
+    return re.sub(r'[\W_]+', '', str(text).lower())
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def make_column_rows(series):
+    # строки датасета сгруппированы по значению: строки значения i - order[offsets[i]:offsets[i + 1]]
+    codes, values = pd.factorize(series)
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    sorted_codes = codes[order]
+    offsets = np.searchsorted(sorted_codes, np.arange(len(values) + 1))
+    start = offsets[0]
+    # пропуски (код -1) стоят в начале, их отрезаем
+    return {'values': np.asarray(values, dtype=object), 'order': order[start:], 'offsets': offsets - start}
+
+
+def make_search_index(df):
+    # триграммы строим по уникальным названиям, а не по строкам: их на порядки меньше
+    columns = {col: make_column_rows(df[col]) for col in SEARCH_COLUMNS}
+
+    entry_column, entry_value, entry_devices, names = [], [], [], []
+    for col_id, col in enumerate(SEARCH_COLUMNS):
+        values = columns[col]['values']
+        entry_column.append(np.full(len(values), col_id, dtype=np.int8))
+        entry_value.append(np.arange(len(values), dtype=np.int32))
+        entry_devices.append(np.diff(columns[col]['offsets']))
+        names.extend(normalize_name(value) for value in values)
+
+    postings = {}
+    for entry, name in enumerate(names):
+        for gram in trigrams(name):
+            postings.setdefault(gram, []).append(entry)
+
+    return {
+        'columns': columns,
+        'entry_column': np.concatenate(entry_column),
+        'entry_value': np.concatenate(entry_value),
+        'entry_devices': np.concatenate(entry_devices),
+        'names': pd.Series(names, dtype='string[pyarrow]'),
+        'name_length': np.array([len(name) for name in names], dtype=np.int32),
+        'postings': {gram: np.array(entries, dtype=np.int32) for gram, entries in postings.items()},
+    }
+
+
+def update_column_rows(rows, series, start):
+    # строки дельты дописаны в конец датасета с номера start: старые номера не сдвигаются,
+    # новые строки каждого значения встают после старых
+    values = rows['values']
+    known = pd.Index(values).get_indexer(series)
+    new_values = pd.unique(series[(known == -1) & series.notna()].to_numpy(dtype=object))
+    values = np.concatenate([values, np.asarray(new_values, dtype=object)])
+    codes = pd.Index(values).get_indexer(series)
+    present = codes >= 0
+
+    all_codes = np.concatenate([np.repeat(np.arange(len(rows['values'])), np.diff(rows['offsets'])), codes[present]])
+    all_rows = np.concatenate([rows['order'], (np.arange(len(series)) + start)[present]]).astype(np.int32)
+    order = np.argsort(all_codes, kind='stable')
+    offsets = np.searchsorted(all_codes[order], np.arange(len(values) + 1))
+    return {'values': values, 'order': all_rows[order], 'offsets': offsets}, len(new_values)
+
+
+def update_search_index(index, delta, start):
+    # новые названия получают номера в конце, поэтому списки триграмм остаются отсортированными
+    # и просто дописываются; триграммы старых названий не пересчитываются
+    columns, entry_column, entry_value, names = {}, [], [], []
+    for col_id, col in enumerate(SEARCH_COLUMNS):
+        old_values = len(index['columns'][col]['values'])
+        columns[col], added = update_column_rows(index['columns'][col], delta[col].reset_index(drop=True), start)
+        entry_column.append(np.full(added, col_id, dtype=np.int8))
+        entry_value.append(np.arange(old_values, old_values + added, dtype=np.int32))
+        names.extend(normalize_name(value) for value in columns[col]['values'][old_values:])
+
+    entry_column = np.concatenate([index['entry_column']] + entry_column)
+    entry_value = np.concatenate([index['entry_value']] + entry_value)
+    entry_devices = np.empty(len(entry_column), dtype=np.int64)
+    for col_id, col in enumerate(SEARCH_COLUMNS):
+        mask = entry_column == col_id
+        entry_devices[mask] = np.diff(columns[col]['offsets'])[entry_value[mask]]
+
+    postings = dict(index['postings'])
+    added = {}
+    for entry, name in enumerate(names, start=len(index['names'])):
+        for gram in trigrams(name):
+            added.setdefault(gram, []).append(entry)
+    for gram, entries in added.items():
+        postings[gram] = np.concatenate([postings.get(gram, np.array([], dtype=np.int32)),
+                                         np.array(entries, dtype=np.int32)])
+
+    return {
+        'columns': columns,
+        'entry_column': entry_column,
+        'entry_value': entry_value,
+        'entry_devices': entry_devices,
+        'names': pd.concat([index['names'], pd.Series(names, dtype='string[pyarrow]')], ignore_index=True),
+        'name_length': np.concatenate([index['name_length'], np.array([len(name) for name in names], dtype=np.int32)]),
+        'postings': postings,
+    }
+
+
+def build_search_index(df, data_version):
+    return cached_prepared_index('search', make_search_index, df, data_version)
+
+
+def shared_trigrams(index, grams, min_score):
+    # названия, набравшие хотя бы need триграмм из k, обязательно есть в одном из k - need + 1
+    # самых редких списков - кандидатов берем только оттуда, а не из огромных списков вроде "mod"
+    postings = sorted((index['postings'].get(gram, np.array([], dtype=np.int32)) for gram in grams), key=len)
+    need = max(1, int(np.ceil(min_score * len(grams))))
+    rare = len(grams) - need + 1
+    rare_counts = np.bincount(np.concatenate(postings[:rare]), minlength=len(index['names']))
+    candidates = np.flatnonzero(rare_counts)
+
+    shared = rare_counts[candidates]
+    for posting in postings[rare:]:
+        if len(posting):
+            # списки отсортированы по номеру названия, проверка вхождения - бинарный поиск
+            positions = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+            shared += posting[positions] == candidates
+    return candidates, shared / len(grams)
+
+
+def search_names(index, query, columns=None, limit=10, min_score=MIN_SCORE):
+    # ранжирование: доля триграмм запроса в названии, при равенстве - более короткое название,
+    # потом более частое в датасете
+    query = normalize_name(query)
+    columns = columns or SEARCH_COLUMNS
+    column_ids = [SEARCH_COLUMNS.index(col) for col in columns]
+
+    grams = trigrams(query)
+    if grams:
+        candidates, scores = shared_trigrams(index, grams, min_score)
+    elif query:
+        # для запросов короче трех символов ("i7") хватает подстроки
+        candidates = np.flatnonzero(index['names'].str.contains(query, regex=False).to_numpy(dtype=bool))
+        scores = np.ones(len(candidates))
+    else:
+        candidates, scores = np.array([], dtype=np.int64), np.array([])
+
+    keep = (scores >= min_score) & np.isin(index['entry_column'][candidates], column_ids)
+    candidates, scores = candidates[keep], scores[keep]
+    order = np.lexsort((
+        -index['entry_devices'][candidates], index['name_length'][candidates], -scores
+    ))[:limit]
+    top = candidates[order]
+
+    columns = [SEARCH_COLUMNS[c] for c in index['entry_column'][top]]
+    return pd.DataFrame({
+        'column': columns,
+        'value': [index['columns'][col]['values'][v] for col, v in zip(columns, index['entry_value'][top])],
+        'score': scores[order],
+        'devices': index['entry_devices'][top],
+    })
+
+
+def matching_rows(index, column, values):
+    # номера строк датасета (по порядку) с любым из найденных значений колонки
+    rows = index['columns'][column]
+    positions = pd.Index(rows['values']).get_indexer(list(values))
+    parts = [rows['order'][rows['offsets'][i]:rows['offsets'][i + 1]] for i in positions if i >= 0]
+    return np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.int32)
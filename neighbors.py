@@ -0,0 +1,94 @@
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from data import cached_prepared_index
+
+SIMILAR_FEATURES = ['ram_gb', 'storage_gb', 'cpu_cores', 'display_size_in', 'price']
+SIMILAR_COLUMNS = ['model', 'brand', 'device_type'] + SIMILAR_FEATURES
+# новые строки сначала копятся в группе рядом с деревом и проверяются перебором;
+# дерево группы пересобирается, когда их набирается больше этой доли от дерева
+REBUILD_FRACTION = 0.1
+
+
+def scale_features(df, mean, std):
+    features = df[SIMILAR_FEATURES].astype(float)
+    valid = features.notna().all(axis=1).to_numpy()
+    scaled = (features.to_numpy()[valid] - mean) / std
+    return scaled, df.loc[valid, SIMILAR_COLUMNS].reset_index(drop=True)
+
+
+def make_similar_trees(df, mean, std):
+    # одно дерево на каждую пару (бренд, тип устройства)
+    scaled, devices = scale_features(df, mean, std)
+
+    trees = {}
+    for key, rows in devices.groupby(['brand', 'device_type']).indices.items():
+        # храним колонки группы как numpy массивы, чтобы ответ не трогал pandas
+        group = {col: devices[col].to_numpy()[rows] for col in SIMILAR_COLUMNS}
+        trees[key] = (KDTree(scaled[rows]), group)
+    return trees
+
+
+def make_similar_index(df):
+    features = df[SIMILAR_FEATURES].astype(float)
+    mean = features.mean().to_numpy()
+    std = features.std().replace(0, 1).fillna(1).to_numpy()
+    return {'trees': make_similar_trees(df, mean, std), 'pending': {}, 'mean': mean, 'std': std}
+
+
+def concat_group(first, second):
+    return (
+        np.concatenate([first[0], second[0]]),
+        {col: np.concatenate([first[1][col], second[1][col]]) for col in SIMILAR_COLUMNS},
+    )
+
+
+def update_similar_index(index, delta):
+    # масштаб признаков остается от полной сборки, чтобы старые деревья не пришлось трогать;
+    # строки дельты дописываются к группам, деревья пересобираются только у переполненных
+    scaled, devices = scale_features(delta, index['mean'], index['std'])
+    trees, pending = dict(index['trees']), dict(index.get('pending', {}))
+    for key, rows in devices.groupby(['brand', 'device_type']).indices.items():
+        new = (scaled[rows], {col: devices[col].to_numpy()[rows] for col in SIMILAR_COLUMNS})
+        if key in pending:
+            new = concat_group(pending[key], new)
+        if key in trees and len(new[0]) <= REBUILD_FRACTION * len(trees[key][1]['price']):
+            pending[key] = new
+            continue
+        if key in trees:
+            tree, group = trees[key]
+            new = concat_group((np.asarray(tree.data), group), new)
+        trees[key] = (KDTree(new[0]), new[1])
+        pending.pop(key, None)
+    return {**index, 'trees': trees, 'pending': pending}
+
+
+def build_similar_index(df, data_version):
+    return cached_prepared_index('similar', make_similar_index, df, data_version)
+
+
+def find_similar_devices(index, brand, device_type, config, k=5):
+    entry = index['trees'].get((brand, device_type))
+    if entry is None:
+        return None
+
+    tree, devices = entry
+    point = np.array([[config[col] for col in SIMILAR_FEATURES]], dtype=float)
+    point = (point - index['mean']) / index['std']
+
+    distances, rows = tree.query(point, k=min(k, len(devices['price'])))
+    distances, rows = distances[0], rows[0]
+
+    similar = {col: values[rows] for col, values in devices.items()}
+    if (brand, device_type) in index.get('pending', {}):
+        # дописанные после сборки дерева строки - перебором, их мало
+        scaled, added = index['pending'][(brand, device_type)]
+        added_distances = np.sqrt(((scaled - point) ** 2).sum(axis=1))
+        distances = np.concatenate([distances, added_distances])
+        similar = {col: np.concatenate([similar[col], added[col]]) for col in similar}
+        nearest = np.argsort(distances, kind='stable')[:k]
+        distances = distances[nearest]
+        similar = {col: values[nearest] for col, values in similar.items()}
+
+    similar['distance'] = distances
+    return similar
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from data import cached_prepared_index
+
+PERCENTILE_COLUMNS = ['price', 'ram_gb', 'storage_gb', 'vram_gb', 'refresh_hz', 'battery_wh', 'weight_kg']
+PERCENTILE_COLUMN_NAMES = {
+    'price': 'Цена, $',
+    'ram_gb': 'ОЗУ, ГБ',
+    'storage_gb': 'Накопитель, ГБ',
+    'vram_gb': 'Видеопамять, ГБ',
+    'refresh_hz': 'Частота экрана, Гц',
+    'battery_wh': 'Батарея, Wh',
+    'weight_kg': 'Вес, кг',
+}
+# сегмент - как в справках для чата: тип устройства и форм-фактор
+SEGMENT_COLUMNS = ['device_type', 'form_factor']
+
+
+def sorted_counts(values, counts):
+    # отсортированные уникальные значения и накопленные счетчики: строк меньше values[i] - cumulative[i].
+    # вместо 10M отсортированных чисел хранятся только разные значения, а их у цен с центами и объемов памяти немного
+    unique, inverse = np.unique(values, return_inverse=True)
+    cumulative = np.concatenate([[0], np.cumsum(np.bincount(inverse, weights=counts, minlength=len(unique)))])
+    return unique, cumulative.astype(np.int64)
+
+
+def make_percentile_index(df):
+    # по одному отсортированному массиву на (колонка, сегмент); весь рынок - сумма по сегментам
+    index = {col: {} for col in PERCENTILE_COLUMNS}
+    columns = {col: df[col].to_numpy(dtype=float) for col in PERCENTILE_COLUMNS}
+    for key, rows in df.groupby(SEGMENT_COLUMNS, dropna=False).indices.items():
+        for col in PERCENTILE_COLUMNS:
+            values = columns[col][rows]
+            values = values[~np.isnan(values)]
+            index[col][key] = sorted_counts(values, np.ones(len(values)))
+    return index
+
+
+def update_percentile_index(index, delta):
+    # счетчики складываются, поэтому дельта сливается с готовыми массивами без полного датасета
+    delta_index = make_percentile_index(delta)
+    merged = {}
+    for col in PERCENTILE_COLUMNS:
+        merged[col] = dict(index[col])
+        for key, (values, cumulative) in delta_index[col].items():
+            if key in merged[col]:
+                old_values, old_cumulative = merged[col][key]
+                values = np.concatenate([old_values, values])
+                counts = np.concatenate([np.diff(old_cumulative), np.diff(cumulative)])
+                merged[col][key] = sorted_counts(values, counts)
+            else:
+                merged[col][key] = (values, cumulative)
+    return merged
+
+
+def build_percentile_index(df, data_version):
+    return cached_prepared_index('percentiles', make_percentile_index, df, data_version)
+
+
+def segment_keys(index, segment=None):
+    # segment - словарь по SEGMENT_COLUMNS, можно неполный (только тип устройства); None - весь рынок
+    segment = segment or {}
+    positions = [SEGMENT_COLUMNS.index(col) for col in segment]
+    return [
+        key for key in index[PERCENTILE_COLUMNS[0]]
+        if all(key[i] == segment[col] for i, col in zip(positions, segment))
+    ]
+
+
+def percentile_of(index, col, value, segment=None):
+    # доля устройств дешевле (меньше) плюс половина равных - два бинарных поиска на сегмент, без прохода по данным
+    below = equal = total = 0
+    for key in segment_keys(index, segment):
+        values, cumulative = index[col][key]
+        left, right = np.searchsorted(values, value, side='left'), np.searchsorted(values, value, side='right')
+        below += cumulative[left]
+        equal += cumulative[right] - cumulative[left]
+        total += cumulative[-1]
+    if total == 0:
+        return None
+    return 100 * (below + equal / 2) / total
+
+
+def device_percentiles(index, config):
+    # config - устройство или конфигурация, колонок может не хватать (у предсказания нет веса и батареи)
+    segment = {col: config[col] for col in SEGMENT_COLUMNS if pd.notna(config.get(col))}
+    rows = []
+    for col in PERCENTILE_COLUMNS:
+        value = config.get(col)
+        if value is None or pd.isna(value):
+            continue
+        rows.append({
+            'column': col,
+            'value': float(value),
+            'market': percentile_of(index, col, value),
+            'segment': percentile_of(index, col, value, segment),
+        })
+    return pd.DataFrame(rows, columns=['column', 'value', 'market', 'segment'])
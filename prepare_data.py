@@ -0,0 +1,283 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from aggregates import build_aggregates
+from data import DATA_DIR, MANIFEST_PATH, dataset_paths
+
+KAGGLE_DATASET = "paperxd/all-computer-prices"
+KAGGLE_FILE = "computer_prices_all.csv"
+
+TEXT_COLUMNS = [
+    'device_type', 'brand', 'model', 'os', 'form_factor', 'cpu_brand', 'cpu_model',
+    'gpu_brand', 'gpu_model', 'storage_type', 'display_type', 'resolution', 'wifi',
+]
+NUMERIC_COLUMNS = [
+    'release_year', 'cpu_tier', 'cpu_cores', 'cpu_threads', 'cpu_base_ghz', 'cpu_boost_ghz',
+    'gpu_tier', 'vram_gb', 'ram_gb', 'storage_gb', 'storage_drive_count', 'display_size_in',
+    'refresh_hz', 'battery_wh', 'charger_watts', 'psu_watts', 'bluetooth', 'weight_kg',
+    'warranty_months', 'price',
+]
+# без этих полей строка бесполезна для всех страниц
+REQUIRED_COLUMNS = ['device_type', 'brand', 'model', 'release_year', 'price']
+
+
+def fetch_kaggle():
+    import kagglehub
+
+    path = kagglehub.dataset_download(KAGGLE_DATASET)
+    found = glob.glob(os.path.join(path, "**", KAGGLE_FILE), recursive=True)
+    if not found:
+        raise FileNotFoundError(f"В скачанном датасете нет {KAGGLE_FILE}: {path}")
+    return found[0]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def validate_schema(df):
+    missing = [col for col in TEXT_COLUMNS + NUMERIC_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"В данных нет колонок: {', '.join(missing)}")
+
+    df = df.copy()
+    for col in NUMERIC_COLUMNS:
+        values = pd.to_numeric(df[col], errors='coerce')
+        broken = df[col].notna() & values.isna()
+        if broken.any():
+            examples = ", ".join(map(str, df.loc[broken, col].unique()[:3]))
+            raise ValueError(f"В колонке {col} {broken.sum()} нечисловых значений, например: {examples}")
+        df[col] = values
+
+    if (df['price'] <= 0).any():
+        raise ValueError(f"Неположительная цена в {(df['price'] <= 0).sum()} строках")
+
+    incomplete = df[REQUIRED_COLUMNS].isna().any(axis=1)
+    if incomplete.any():
+        print(f"Пропущено строк без {', '.join(REQUIRED_COLUMNS)}: {incomplete.sum()}")
+        df = df[~incomplete].reset_index(drop=True)
+    if df.empty:
+        raise ValueError("После проверки не осталось ни одной строки")
+    return df
+
+
+def write_arrow_dataset(df, path):
+    # Arrow IPC без сжатия и одним батчем: процессы приложения отображают его в память как есть,
+    # без распаковки и склейки кусков в своей памяти
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = pa.schema([
+        pa.field(field.name, pa.large_string()) if pa.types.is_string(field.type) else field
+        for field in table.schema
+    ])
+    table = table.cast(schema).combine_chunks()
+    with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+
+
+def build_indexes(df):
+    # sklearn нужен только тут и на своих страницах
+    from neighbors import make_similar_index
+    from retrieval import make_retrieval_index
+    from name_search import make_search_index
+    from percentiles import make_percentile_index
+
+    return {
+        'similar': make_similar_index(df),
+        'retrieval': make_retrieval_index(df),
+        'search': make_search_index(df),
+        'percentiles': make_percentile_index(df),
+    }
+
+
+def make_version_dir(version):
+    version_dir = f"v{version}"
+    os.makedirs(os.path.join(DATA_DIR, version_dir, "aggregates"), exist_ok=True)
+    os.makedirs(os.path.join(DATA_DIR, version_dir, "indexes"), exist_ok=True)
+    return version_dir
+
+
+def write_dataset(df, version_dir, manifest):
+    manifest["dataset"] = os.path.join(version_dir, "computer_prices.parquet")
+    manifest["dataset_arrow"] = os.path.join(version_dir, "computer_prices.arrow")
+    manifest["dataset_parts"] = []
+    df.to_parquet(os.path.join(DATA_DIR, manifest["dataset"]), index=False)
+    write_arrow_dataset(df, os.path.join(DATA_DIR, manifest["dataset_arrow"]))
+
+
+def write_dataset_part(delta, version_dir, manifest):
+    # новые строки ложатся отдельным файлом в папку своей версии, старые файлы не переписываются
+    part = {
+        "parquet": os.path.join(version_dir, "computer_prices_part.parquet"),
+        "arrow": os.path.join(version_dir, "computer_prices_part.arrow"),
+        "rows": len(delta),
+    }
+    delta.to_parquet(os.path.join(DATA_DIR, part["parquet"]), index=False)
+    write_arrow_dataset(delta, os.path.join(DATA_DIR, part["arrow"]))
+    manifest["dataset_parts"] = manifest.get("dataset_parts", []) + [part]
+
+
+def write_aggregates(aggregates, version_dir, manifest):
+    manifest["aggregates"] = {}
+    for name, aggregate in aggregates.items():
+        manifest["aggregates"][name] = os.path.join(version_dir, "aggregates", f"{name}.parquet")
+        aggregate.to_parquet(os.path.join(DATA_DIR, manifest["aggregates"][name]), index=False)
+
+
+def write_indexes(indexes, version_dir, manifest):
+    manifest["indexes"] = {}
+    for name, index in indexes.items():
+        write_index(name, index, version_dir, manifest)
+
+
+def write_index(name, index, version_dir, manifest):
+    manifest.setdefault("indexes", {})[name] = os.path.join(version_dir, "indexes", f"{name}.pkl")
+    with open(os.path.join(DATA_DIR, manifest["indexes"][name]), "wb") as f:
+        pickle.dump(index, f)
+
+
+def write_segments(version_dir, manifest, model_data=None):
+    # сегменты кодируют категории энкодерами модели цен, поэтому строятся после нее;
+    # без переобучения берем энкодеры последней модели, а если модели нет совсем - пропускаем
+    from segments import make_segments
+    from task6 import read_price_model
+
+    model_data = model_data or read_price_model()
+    if model_data is None:
+        print("Сегменты пропущены: нет модели цен")
+        return
+    print("Строим сегменты")
+    write_index('segments', make_segments(dataset_paths(manifest), model_data),
+                version_dir, manifest)
+
+
+def read_previous_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    with open(MANIFEST_PATH, encoding="utf8") as f:
+        return json.load(f)
+
+
+def write_manifest(manifest):
+    # манифест подменяется одним rename: воркеры видят либо старую, либо новую версию целиком
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+    # копия в папке версии: по ней страница, начатая на этой версии, дочитывает свои файлы после обновления
+    with open(os.path.join(DATA_DIR, f"v{manifest['version']}", "manifest.json"), "w", encoding="utf8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def dataset_versions(manifest):
+    # версии, в папках которых лежат файлы датасета: база и каждая дописанная часть
+    paths = [manifest["dataset"]] + [part["parquet"] for part in manifest.get("dataset_parts", [])]
+    return {int(os.path.normpath(path).split(os.sep)[0][1:]) for path in paths}
+
+
+def remove_old_versions(manifest, previous=None):
+    # предыдущую версию не трогаем, ее еще могут дочитывать запущенные сессии;
+    # из старых папок с частями датасета убираем все, кроме самих частей
+    keep = {manifest["version"]} | ({previous["version"]} if previous else set())
+    parts = dataset_versions(manifest) | (dataset_versions(previous) if previous else set())
+    for entry in os.listdir(DATA_DIR):
+        if not (entry.startswith("v") and entry[1:].isdigit()) or int(entry[1:]) in keep:
+            continue
+        if int(entry[1:]) not in parts:
+            shutil.rmtree(os.path.join(DATA_DIR, entry))
+            continue
+        for sub in ("aggregates", "indexes", "snapshots"):
+            shutil.rmtree(os.path.join(DATA_DIR, entry, sub), ignore_errors=True)
+
+
+def prepare(source_path, source_name, train_model=True, force=False, model_rows=None):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    previous = read_previous_manifest()
+    source_hash = file_sha256(source_path)
+    if previous and previous.get("source_sha256") == source_hash and not force:
+        print(f"Данные не изменились, версия {previous['version']}")
+        return previous
+
+    print(f"Читаем {source_path}")
+    df = validate_schema(pd.read_csv(source_path))
+
+    version = previous["version"] + 1 if previous else 1
+    version_dir = make_version_dir(version)
+
+    manifest = {
+        "version": version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": source_name,
+        "source_sha256": source_hash,
+        "rows": len(df),
+        "columns": {col: str(dtype) for col, dtype in df.dtypes.items()},
+    }
+    write_dataset(df, version_dir, manifest)
+    write_aggregates(build_aggregates(df), version_dir, manifest)
+
+    print("Строим индексы")
+    write_indexes(build_indexes(df), version_dir, manifest)
+
+    model_data = None
+    if train_model:
+        from task6 import fit_price_model, MODEL_PATH, ESTIMATOR_PATH, FOREST_ARRAYS_PATH
+
+        # на больших синтетических наборах модель учим на выборке, иначе лес строится часами
+        train_df = df.sample(model_rows, random_state=42) if model_rows and len(df) > model_rows else df
+        print(f"Обучаем модель на {len(train_df)} строках")
+        model_data = fit_price_model(train_df)
+        manifest["model"] = {
+            "path": os.path.relpath(MODEL_PATH, DATA_DIR),
+            "estimator": os.path.relpath(ESTIMATOR_PATH, DATA_DIR),
+            "forest_arrays": os.path.relpath(FOREST_ARRAYS_PATH, DATA_DIR),
+            "metrics": {name: float(value) for name, value in model_data['metrics'].items()},
+        }
+    elif previous and "model" in previous:
+        manifest["model"] = previous["model"]
+
+    write_segments(version_dir, manifest, model_data)
+    write_manifest(manifest)
+    remove_old_versions(manifest, previous)
+    print(f"Готово: версия {version}, строк {len(df)}, манифест {MANIFEST_PATH}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Подготовка данных для приложения: схема, parquet, агрегаты, индексы, модель и манифест"
+    )
+    parser.add_argument("--csv", help="локальный CSV вместо скачивания с Kaggle")
+    parser.add_argument("--skip-model", action="store_true", help="не переобучать модель")
+    parser.add_argument("--force", action="store_true", help="пересобрать, даже если исходник не изменился")
+    parser.add_argument("--model-rows", type=int, help="обучать модель на случайной выборке из стольких строк")
+    args = parser.parse_args()
+
+    try:
+        if args.csv:
+            source_path, source_name = args.csv, os.path.abspath(args.csv)
+        else:
+            source_path = fetch_kaggle()
+            source_name = f"kaggle:{KAGGLE_DATASET}"
+        prepare(source_path, source_name, train_model=not args.skip_model, force=args.force,
+                model_rows=args.model_rows)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def app_pages():
+    # заголовки страниц - из st.Page в main.py, так новые страницы попадают в профиль сами
+    with open(os.path.join(APP_DIR, "main.py"), encoding="utf8") as f:
+        return re.findall(r'st\.Page\("[^"]+",\s*title="([^"]+)"', f.read())
+
+
+PAGES = app_pages()
+
+# страница выполняется без сервера streamlit: st.Page и st.navigation подменяются,
+# навигация сразу выполняет файл страницы с нужным заголовком
+RUN_PAGE = """
+import runpy, sys, types
+import streamlit as st
+title = sys.argv[1]
+st.Page = lambda page, title=None, **kwargs: types.SimpleNamespace(
+    title=title, run=lambda: runpy.run_path(page, run_name="__page__"))
+st.navigation = lambda pages, *args, **kwargs: next((p for p in pages if p.title == title), pages[0])
+runpy.run_path("main.py", run_name="__main__")
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_page(page):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_PAGE, page],
+        cwd=APP_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Профиль импортов (-X importtime) для каждой страницы")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--top", type=int, default=8, help="сколько самых тяжелых пакетов показать")
+    args = parser.parse_args()
+
+    print(f"{'страница':<20}{'импорт, мс':>12}{'модулей':>10}  самые тяжелые пакеты верхнего уровня")
+    for page in args.pages:
+        modules = profile_page(page)
+        total_ms = sum(self_us for _, self_us, _, _ in modules) / 1000
+        top_level = sorted(
+            ((name, cumulative) for name, _, cumulative, depth in modules if depth == 0),
+            key=lambda item: item[1], reverse=True
+        )[:args.top]
+        heavy = ", ".join(f"{name} {cumulative / 1000:.0f}" for name, cumulative in top_level)
+        print(f"{page:<20}{total_ms:>12.0f}{len(modules):>10}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
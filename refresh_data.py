@@ -0,0 +1,187 @@
+import argparse
+import functools
+import glob
+import os
+import pickle
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from aggregates import build_aggregates, merge_aggregates
+from data import DATA_DIR, dataset_paths, load_prepared_dataset
+from prepare_data import (
+    file_sha256, validate_schema, read_previous_manifest, write_manifest, remove_old_versions,
+    make_version_dir, write_dataset, write_dataset_part, write_aggregates, write_indexes, write_index,
+    write_segments,
+)
+
+DROP_DIR = os.getenv("DROP_DIR", os.path.join(DATA_DIR, "drops"))
+POLL_SECONDS = 5
+# файл, который менялся совсем недавно, возможно еще дописывается
+SETTLE_SECONDS = 2
+# после стольких частей или такой доли строк в частях датасет переписывается одним файлом
+MAX_DATASET_PARTS = 16
+COMPACT_FRACTION = 0.1
+
+
+def read_previous_aggregates(manifest):
+    return {
+        name: pd.read_parquet(os.path.join(DATA_DIR, path))
+        for name, path in manifest.get("aggregates", {}).items()
+    }
+
+
+def read_previous_index(manifest, name):
+    path = manifest.get("indexes", {}).get(name)
+    if path is None:
+        return None
+    with open(os.path.join(DATA_DIR, path), "rb") as f:
+        return pickle.load(f)
+
+
+def dataset_rows(manifest):
+    # в манифестах от старого prepare_data.py числа строк нет - берем из метаданных parquet
+    if "rows" in manifest:
+        return manifest["rows"]
+    return sum(pq.ParquetFile(path).metadata.num_rows for path in dataset_paths(manifest))
+
+
+def update_indexes(previous, delta, start, full_frame):
+    from neighbors import make_similar_index, update_similar_index
+    from retrieval import make_retrieval_index, update_retrieval_index
+    from name_search import make_search_index, update_search_index
+    from percentiles import make_percentile_index, update_percentile_index
+
+    # индексы дописываются строками дельты, start - номер ее первой строки в датасете;
+    # индексы от старого prepare_data.py (без пары, счетчиков или дописывания) собираем заново по full_frame()
+    similar = read_previous_index(previous, 'similar')
+    retrieval = read_previous_index(previous, 'retrieval')
+    search = read_previous_index(previous, 'search')
+    percentiles = read_previous_index(previous, 'percentiles')
+    return {
+        'similar': (update_similar_index(similar, delta) if similar and 'pending' in similar
+                    else make_similar_index(full_frame())),
+        'retrieval': (update_retrieval_index(retrieval, delta) if retrieval and 'stats' in retrieval
+                      else make_retrieval_index(full_frame())),
+        'search': update_search_index(search, delta, start) if search else make_search_index(full_frame()),
+        'percentiles': (update_percentile_index(percentiles, delta) if percentiles
+                        else make_percentile_index(full_frame())),
+    }
+
+
+def apply_delta(path):
+    previous = read_previous_manifest()
+    if previous is None:
+        raise FileNotFoundError("Нет подготовленных данных, сначала запустите python prepare_data.py")
+
+    delta_hash = file_sha256(path)
+    if any(d["sha256"] == delta_hash for d in previous.get("deltas", [])):
+        print(f"{path} уже применен")
+        return previous
+
+    delta = validate_schema(pd.read_csv(path))
+    # старые строки не перечитываются из CSV и не проверяются заново; обычно весь датасет не нужен вовсе:
+    # дельта ложится частью, агрегаты и индексы дописываются ею, нужны только порядок колонок и число строк
+    delta = delta[pq.read_schema(dataset_paths(previous)[0]).names]
+    start = dataset_rows(previous)
+    rows = start + len(delta)
+
+    @functools.cache
+    def full_frame():
+        # весь датасет (из mmap) - только для уплотнения и для агрегатов и индексов старого формата
+        return pd.concat([load_prepared_dataset(mmap=True, manifest=previous), delta], ignore_index=True)
+
+    version = previous["version"] + 1
+    version_dir = make_version_dir(version)
+    manifest = {
+        **previous,
+        "version": version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "rows": rows,
+        "deltas": previous.get("deltas", []) + [
+            {"file": os.path.basename(path), "sha256": delta_hash, "rows": len(delta)}
+        ],
+    }
+    # дельта дописывается отдельной частью; когда частей или строк в них становится много,
+    # датасет уплотняется в один файл - чтобы процессы приложения снова делили его через mmap
+    parts = previous.get("dataset_parts", [])
+    part_rows = sum(part["rows"] for part in parts) + len(delta)
+    if len(parts) + 1 > MAX_DATASET_PARTS or part_rows > COMPACT_FRACTION * rows:
+        print(f"Уплотняем датасет: {len(parts) + 1} частей, {part_rows} строк")
+        write_dataset(full_frame(), version_dir, manifest)
+    else:
+        write_dataset_part(delta, version_dir, manifest)
+
+    # агрегаты складываются из старых и посчитанных по одной дельте; если какого-то агрегата
+    # в прошлой версии не было (данные от старого prepare_data.py), считаем все по полным данным
+    previous_aggregates = read_previous_aggregates(previous)
+    delta_aggregates = build_aggregates(delta)
+    if set(delta_aggregates) <= set(previous_aggregates):
+        aggregates = merge_aggregates(previous_aggregates, delta_aggregates)
+    else:
+        aggregates = build_aggregates(full_frame())
+    write_aggregates(aggregates, version_dir, manifest)
+    write_indexes(update_indexes(previous, delta, start, full_frame), version_dir, manifest)
+
+    # модель не переобучаем на каждую дельту, она остается от последнего prepare_data.py;
+    # сегменты с ее энкодерами дообучаем по строкам дельты, а сегменты старого формата
+    # (без счетчиков) собираем заново по новой версии, кусками из parquet
+    segments = read_previous_index(previous, 'segments')
+    if segments is not None and 'counts' in segments:
+        from segments import update_segments
+        write_index('segments', update_segments(segments, delta), version_dir, manifest)
+    else:
+        write_segments(version_dir, manifest)
+    write_manifest(manifest)
+    remove_old_versions(manifest, previous)
+    print(f"{os.path.basename(path)}: +{len(delta)} строк, версия {version}, всего {rows}")
+    return manifest
+
+
+def pending_drops(drop_dir):
+    now = time.time()
+    return [
+        path for path in sorted(glob.glob(os.path.join(drop_dir, "*.csv")))
+        if now - os.path.getmtime(path) >= SETTLE_SECONDS
+    ]
+
+
+def process_drops(drop_dir):
+    for sub in ("applied", "failed"):
+        os.makedirs(os.path.join(drop_dir, sub), exist_ok=True)
+
+    for path in pending_drops(drop_dir):
+        try:
+            apply_delta(path)
+            shutil.move(path, os.path.join(drop_dir, "applied", os.path.basename(path)))
+        except (ValueError, KeyError, pd.errors.ParserError) as e:
+            # битая дельта не должна останавливать остальные, откладываем ее в failed
+            print(f"{os.path.basename(path)}: ошибка: {e}", file=sys.stderr)
+            shutil.move(path, os.path.join(drop_dir, "failed", os.path.basename(path)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Дописывает CSV-дельты из папки к подготовленным данным и пересчитывает агрегаты и индексы"
+    )
+    parser.add_argument("--drop-dir", default=DROP_DIR)
+    parser.add_argument("--watch", action="store_true", help="следить за папкой, а не обработать ее один раз")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS)
+    args = parser.parse_args()
+
+    try:
+        process_drops(args.drop_dir)
+        while args.watch:
+            time.sleep(args.interval)
+            process_drops(args.drop_dir)
+    except FileNotFoundError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
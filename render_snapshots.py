@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from data import data_ready, load_prepared_dataset, read_manifest, snapshot_path
+
+POLL_SECONDS = 5
+
+# датасет воркера пула, грузится один раз в initializer
+dataset = None
+
+
+def init_worker(manifest):
+    global dataset
+    dataset = load_prepared_dataset(mmap=True, manifest=manifest)
+
+
+def render_statistics_chart(key):
+    from statistics_charts import STATISTICS_CHARTS
+
+    return key, STATISTICS_CHARTS[key](dataset).to_json()
+
+
+def render_dynamics():
+    # страница динамики строится по агрегатам, датасет ей не нужен
+    from data import load_aggregate, has_aggregate
+    from price_sketch import merge_sketches, price_trend, sketch_quantiles
+    from task3 import build_plot, build_price_trend, dynamics_defaults, select_years_brands
+
+    yearly_counts = load_aggregate('year_brand_counts')
+    view = dynamics_defaults(yearly_counts)
+    yearly_data = select_years_brands(yearly_counts, view['min_year'], view['max_year'], view['brands'])
+    figures = {'counts': build_plot(yearly_data, view['min_year'], view['max_year'], view['chart_type']).to_json()}
+    overall_median = None
+    if has_aggregate('year_brand_price_sketches'):
+        sketches = select_years_brands(
+            load_aggregate('year_brand_price_sketches'), view['min_year'], view['max_year'], view['brands']
+        )
+        figures['price_trend'] = build_price_trend(price_trend(sketches), view['min_year'], view['max_year']).to_json()
+        overall_median, = sketch_quantiles(merge_sketches(sketches), [0.5])
+    return figures, overall_median
+
+
+def write_snapshot(name, snapshot, manifest):
+    path = snapshot_path(name, manifest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # как и манифест, подменяется одним rename - страница не прочитает недописанный файл
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def render(workers=None):
+    from statistics_charts import STATISTICS_CHARTS
+
+    manifest = read_manifest()
+    version = manifest["version"]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(manifest,)) as pool:
+        dynamics = pool.submit(render_dynamics)
+        charts = dict(pool.map(render_statistics_chart, STATISTICS_CHARTS))
+        dynamics_figures, overall_median = dynamics.result()
+
+    write_snapshot('statistics', {
+        "version": version,
+        "rows": manifest["rows"],
+        "columns": list(manifest["columns"]),
+        "figures": {key: json.loads(fig) for key, fig in charts.items()},
+    }, manifest)
+    write_snapshot('dynamics', {
+        "version": version,
+        "figures": {key: json.loads(fig) for key, fig in dynamics_figures.items()},
+        "overall_median": overall_median,
+    }, manifest)
+    print(f"Снимки версии {version}: {len(charts)} графиков статистики, "
+          f"{len(dynamics_figures)} динамики за {time.perf_counter() - start:.1f} с")
+    return version
+
+
+def snapshots_ready(manifest):
+    return all(os.path.exists(snapshot_path(name, manifest)) for name in ("statistics", "dynamics"))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Отрисовывает страницы статистики и динамики в виде по умолчанию для текущей версии данных"
+    )
+    parser.add_argument("--workers", type=int, help="процессов в пуле (по умолчанию по числу ядер)")
+    parser.add_argument("--watch", action="store_true", help="ждать новых версий данных и отрисовывать каждую")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS)
+    args = parser.parse_args()
+
+    if not data_ready():
+        print("Ошибка: нет подготовленных данных, сначала запустите python prepare_data.py", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.watch:
+        render(args.workers)
+        return
+    while True:
+        if not snapshots_ready(read_manifest()):
+            render(args.workers)
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from chat_history import estimate_tokens
+from data import cached_prepared_index
+from price_sketch import price_bins, merge_sketches, sketch_quantiles
+
+CONTEXT_TOKEN_BUDGET = 400
+TOP_SNIPPETS = 3
+MIN_SCORE = 0.08
+
+PRICE_BANDS = [0, 500, 1000, 1500, 2000, 3000, float('inf')]
+PRICE_BAND_LABELS = ['до $500', '$500-1000', '$1000-1500', '$1500-2000', '$2000-3000', 'дороже $3000']
+
+# вопросы задают по-русски, а в датасете английские названия сегментов
+SEGMENT_WORDS = {
+    'Laptop': 'ноутбук',
+    'Desktop': 'десктоп настольный компьютер',
+    'Gaming': 'игровой',
+    'Ultrabook': 'ультрабук легкий',
+    'Workstation': 'рабочая станция для работы',
+    'Mainstream': 'обычный для дома и офиса',
+    '2-in-1': 'трансформер',
+}
+
+
+# справки собираются из счетчиков по группам: счетчики складываются по дельтам, как агрегаты,
+# поэтому refresh_data.py не перечитывает датасет ради справок
+GROUPINGS = {'brand': ['brand'], 'segment': ['device_type', 'form_factor'], 'band': ['band']}
+COUNT_COLUMNS = ['device_type', 'form_factor', 'brand', 'cpu_model', 'gpu_model', 'cpu_cores', 'ram_gb',
+                 'storage_gb', 'display_size_in', 'release_year']
+
+
+def count_groups(df):
+    # на каждую группировку: размер и крайние цены групп, счетчики значений колонок и скетч цен (см. price_sketch)
+    df = df.assign(band=pd.cut(df['price'], bins=PRICE_BANDS, labels=PRICE_BAND_LABELS).astype(object))
+    stats = {}
+    for kind, keys in GROUPINGS.items():
+        ranges = df.groupby(keys).agg(
+            size=('price', 'size'), price_min=('price', 'min'), price_max=('price', 'max')
+        ).reset_index()
+        values = pd.concat([
+            df.groupby(keys + [col]).size().rename('count').reset_index()
+            .rename(columns={col: 'value'}).assign(column=col)
+            for col in COUNT_COLUMNS if col not in keys
+        ], ignore_index=True)
+        prices = df[keys].assign(bin=price_bins(df['price'].fillna(1))).loc[df['price'].notna()]
+        stats[kind] = {
+            'ranges': ranges,
+            'values': values,
+            'prices': prices.groupby(keys + ['bin']).size().reset_index(name='count'),
+        }
+    return stats
+
+
+def merge_stats(previous, delta):
+    merged = {}
+    for kind, keys in GROUPINGS.items():
+        ranges = pd.concat([previous[kind]['ranges'], delta[kind]['ranges']], ignore_index=True)
+        values = pd.concat([previous[kind]['values'], delta[kind]['values']], ignore_index=True)
+        prices = pd.concat([previous[kind]['prices'], delta[kind]['prices']], ignore_index=True)
+        merged[kind] = {
+            'ranges': ranges.groupby(keys, as_index=False).agg(
+                size=('size', 'sum'), price_min=('price_min', 'min'), price_max=('price_max', 'max')
+            ),
+            # в value лежат и числа, и строки - без сортировки ключей
+            'values': values.groupby(keys + ['column', 'value'], as_index=False, sort=False)['count'].sum(),
+            'prices': merge_sketches(prices, by=keys),
+        }
+    return merged
+
+
+def _top_values(values, col, n=3):
+    counts = values[values['column'] == col].sort_values('count', ascending=False, kind='stable')
+    return ", ".join(str(value) for value in counts['value'].head(n))
+
+
+def _median(values, col):
+    # медиана по счетчикам значений - как pandas: среднее двух средних элементов
+    counts = values[values['column'] == col].sort_values('value')
+    cumulative = counts['count'].cumsum().to_numpy()
+    if len(cumulative) == 0:
+        return np.nan
+    positions = np.searchsorted(cumulative, [(cumulative[-1] - 1) // 2, cumulative[-1] // 2], side='right')
+    return counts['value'].to_numpy()[positions].astype(float).mean()
+
+
+def _typical_config(values):
+    return (
+        f"типичная конфигурация: {_median(values, 'cpu_cores'):.0f} ядер, "
+        f"ОЗУ {_median(values, 'ram_gb'):.0f} ГБ, накопитель {_median(values, 'storage_gb'):.0f} ГБ, "
+        f"экран {_median(values, 'display_size_in'):.1f}\""
+    )
+
+
+def _price_range(group, prices):
+    # крайние цены точные, медиана - по скетчу с точностью 1%
+    median, = sketch_quantiles(prices, [0.5])
+    return f"цены от ${group.price_min:,.0f} до ${group.price_max:,.0f}, медиана ${median:,.0f}"
+
+
+def _groups(stats, kind):
+    keys = GROUPINGS[kind]
+    values = dict(list(stats[kind]['values'].groupby(keys)))
+    prices = dict(list(stats[kind]['prices'].groupby(keys)))
+    ranges = stats[kind]['ranges']
+    if kind == 'band':
+        ranges = ranges.set_index('band').reindex(PRICE_BAND_LABELS).dropna(subset=['size']).reset_index()
+    else:
+        ranges = ranges.sort_values(keys)
+    for group in ranges.itertuples(index=False):
+        key = tuple(getattr(group, col) for col in keys)
+        yield group, values[key], prices[key]
+
+
+def build_snippets(stats):
+    snippets = []
+
+    for group, values, prices in _groups(stats, 'brand'):
+        years = values.loc[values['column'] == 'release_year', 'value']
+        snippets.append(
+            f"Производитель {group.brand}: {group.size} устройств, {_price_range(group, prices)}; "
+            f"типы: {_top_values(values, 'device_type')}; процессоры: {_top_values(values, 'cpu_model')}; "
+            f"видеокарты: {_top_values(values, 'gpu_model')}; годы выпуска "
+            f"{years.min()}-{years.max()}."
+        )
+
+    for group, values, prices in _groups(stats, 'segment'):
+        device_type, form_factor = group.device_type, group.form_factor
+        snippets.append(
+            f"Сегмент {device_type} {form_factor} ({SEGMENT_WORDS.get(device_type, '')} "
+            f"{SEGMENT_WORDS.get(form_factor, '')}): {group.size} устройств, {_price_range(group, prices)}; "
+            f"{_typical_config(values)}; бренды: {_top_values(values, 'brand')}; "
+            f"видеокарты: {_top_values(values, 'gpu_model')}."
+        )
+
+    for group, values, _ in _groups(stats, 'band'):
+        snippets.append(
+            f"Бюджет {group.band}: {group.size} устройств; {_typical_config(values)}; "
+            f"бренды: {_top_values(values, 'brand')}; процессоры: {_top_values(values, 'cpu_model')}; "
+            f"видеокарты: {_top_values(values, 'gpu_model')}."
+        )
+
+    return snippets
+
+
+def make_retrieval_index(df, stats=None):
+    stats = stats or count_groups(df)
+    snippets = build_snippets(stats)
+    # символьные n-граммы переживают русские окончания и опечатки в названиях моделей,
+    # а шаблонные слова, которые есть почти в каждой справке, отбрасываются через max_df
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), sublinear_tf=True, max_df=0.5)
+    matrix = vectorizer.fit_transform(snippets)
+    return {'snippets': snippets, 'vectorizer': vectorizer, 'matrix': matrix, 'stats': stats}
+
+
+def update_retrieval_index(index, delta):
+    # счетчики дельты складываются с сохраненными; справок несколько десятков, их и tf-idf пересобираем целиком
+    return make_retrieval_index(None, merge_stats(index['stats'], count_groups(delta)))
+
+
+def build_retrieval_index(df, data_version):
+    return cached_prepared_index('retrieval', make_retrieval_index, df, data_version)
+
+
+def retrieve_context(index, question, top_k=TOP_SNIPPETS, budget=CONTEXT_TOKEN_BUDGET):
+    scores = (index['matrix'] @ index['vectorizer'].transform([question]).T).toarray().ravel()
+
+    context = []
+    used = 0
+    for i in np.argsort(scores)[::-1][:top_k]:
+        if scores[i] < MIN_SCORE:
+            break
+        tokens = estimate_tokens(index['snippets'][i])
+        if used + tokens > budget:
+            continue
+        context.append(index['snippets'][i])
+        used += tokens
+    return "\n".join(context)
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+
+from data import read_manifest, load_prepared_index, dataset_paths
+from price_sketch import price_bins, sketch_quantiles
+from task6 import CATEGORICAL_COLUMNS
+
+N_SEGMENTS = 8
+# датасет читается кусками из parquet, целиком в память не попадает
+CHUNK_ROWS = 200_000
+BATCH_ROWS = 4096
+EPOCHS = 3
+
+# характеристики и цена; размеры памяти и цена в логарифме, иначе сегменты делятся только по дорогим машинам
+NUMERIC_FEATURES = ['cpu_cores', 'ram_gb', 'storage_gb', 'display_size_in', 'price']
+LOG_FEATURES = ['ram_gb', 'storage_gb', 'price']
+# бренд не берем: сегмент - про начинку и цену, а не про производителя
+ONE_HOT_FEATURES = ['device_type', 'cpu_brand', 'gpu_brand']
+# несовпадение категории - два отличающихся one-hot признака, с таким весом это расстояние 1
+ONE_HOT_WEIGHT = 1 / np.sqrt(2)
+PROFILE_COLUMNS = ['device_type', 'brand', 'gpu_brand']
+# бренд для профилей уже есть среди категорий модели цен
+READ_COLUMNS = NUMERIC_FEATURES + CATEGORICAL_COLUMNS
+
+
+def iter_chunks(paths, columns):
+    # paths - файлы датасета по порядку (см. data.dataset_paths)
+    for path in paths:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=CHUNK_ROWS, columns=columns):
+            yield batch.to_pandas()
+
+
+def one_hot_features(classes, values):
+    # незнакомое значение - нулевой вектор, а не первая категория, как у кодов модели цен
+    codes = pd.Index(classes).get_indexer(values.astype(str))
+    one_hot = np.zeros((len(values), len(classes)))
+    known = codes >= 0
+    one_hot[np.flatnonzero(known), codes[known]] = ONE_HOT_WEIGHT
+    return one_hot
+
+
+def raw_features(encoders, chunk):
+    # категории - по классам энкодеров модели цен из task6, чтобы сегменты и предсказание говорили на одном языке
+    numeric = chunk[NUMERIC_FEATURES].astype(float).to_numpy()
+    for i, col in enumerate(NUMERIC_FEATURES):
+        if col in LOG_FEATURES:
+            numeric[:, i] = np.log1p(numeric[:, i])
+    one_hot = [
+        one_hot_features(encoders['label_encoders'][col].classes_, chunk[col])
+        for col in ONE_HOT_FEATURES
+    ]
+    return numeric, np.hstack(one_hot)
+
+
+def segment_features(segments, chunk):
+    numeric, one_hot = raw_features(segments['encoders'], chunk)
+    return np.hstack([(numeric - segments['mean']) / segments['std'], one_hot])
+
+
+def feature_stats(paths, encoders):
+    total, square, count = 0, 0, 0
+    for chunk in iter_chunks(paths, READ_COLUMNS):
+        chunk = chunk.dropna()
+        numeric, _ = raw_features(encoders, chunk)
+        total = total + numeric.sum(axis=0)
+        square = square + (numeric ** 2).sum(axis=0)
+        count += len(numeric)
+    mean = total / count
+    std = np.sqrt(np.maximum(square / count - mean ** 2, 0))
+    return mean, np.where(std > 0, std, 1)
+
+
+def fit_centers(paths, segments):
+    from sklearn.cluster import MiniBatchKMeans
+
+    kmeans = MiniBatchKMeans(n_clusters=N_SEGMENTS, batch_size=BATCH_ROWS, random_state=42, n_init=3)
+    rng = np.random.default_rng(42)
+    for _ in range(EPOCHS):
+        for chunk in iter_chunks(paths, READ_COLUMNS):
+            features = segment_features(segments, chunk.dropna())
+            rng.shuffle(features)
+            for start in range(0, len(features), BATCH_ROWS):
+                batch = features[start:start + BATCH_ROWS]
+                # первый вызов инициализирует центры k-means++ по своему батчу, ему нужно строк не меньше кластеров
+                if len(batch) >= N_SEGMENTS:
+                    kmeans.partial_fit(batch)
+    return kmeans.cluster_centers_
+
+
+def nearest_centers(centers, features):
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, первое слагаемое для argmin не нужно
+    return np.argmin((centers ** 2).sum(axis=1) - 2 * features @ centers.T, axis=1)
+
+
+def partial_fit_centers(centers, center_counts, features):
+    # шаг MiniBatchKMeans по новым строкам: центр сдвигается к их среднему с весом их доли
+    # среди всех строк центра, так что старые строки заново проходить не нужно
+    centers, center_counts = centers.copy(), center_counts.copy()
+    for start in range(0, len(features), BATCH_ROWS):
+        batch = features[start:start + BATCH_ROWS]
+        labels = nearest_centers(centers, batch)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, batch)
+        added = np.bincount(labels, minlength=len(centers))
+        center_counts += added
+        moved = added > 0
+        centers[moved] += (sums[moved] - added[moved, None] * centers[moved]) / center_counts[moved, None]
+    return centers, center_counts
+
+
+def segment_counts(segments, chunk):
+    # счетчики сегментов по куску: размер сегмента, частые значения характеристик и скетч цен (см. price_sketch)
+    chunk = chunk[READ_COLUMNS].dropna()
+    chunk['segment'] = nearest_centers(segments['centers'], segment_features(segments, chunk))
+    chunk['bin'] = price_bins(chunk['price'])
+    return pd.concat([
+        chunk.groupby(['segment', col]).size().rename('count').reset_index()
+        .rename(columns={col: 'value'}).assign(column=col)
+        for col in NUMERIC_FEATURES[:-1] + PROFILE_COLUMNS + ['bin']
+    ])
+
+
+def sum_counts(counts):
+    # в value лежат и числа, и строки - без сортировки ключей
+    return pd.concat(counts).groupby(['column', 'segment', 'value'], as_index=False, sort=False)['count'].sum()
+
+
+def make_profiles(counts):
+    # номер сегмента - позиция его центра плюс один
+    rows = []
+    for segment, group in counts.groupby('segment'):
+        sketch = group[group['column'] == 'bin'].rename(columns={'value': 'bin'}).astype({'bin': int})
+        p10, median, p90 = sketch_quantiles(sketch, [0.1, 0.5, 0.9])
+        typical = {
+            col: group.loc[group['column'] == col].sort_values('count', ascending=False)['value'].iloc[0]
+            for col in NUMERIC_FEATURES[:-1] + PROFILE_COLUMNS
+        }
+        rows.append({'segment': segment + 1, 'devices': int(sketch['count'].sum()), **typical,
+                     'price_p10': p10, 'price_median': median, 'price_p90': p90})
+    profiles = pd.DataFrame(rows)
+    profiles['share'] = profiles['devices'] / profiles['devices'].sum()
+    profiles['name'] = [
+        f"{row.device_type}, {row.gpu_brand}, ~${row.price_median:,.0f}" for row in profiles.itertuples()
+    ]
+    return profiles
+
+
+def make_segments(paths, model_data):
+    encoders = {key: model_data[key] for key in ('label_encoders', 'feature_columns')}
+    mean, std = feature_stats(paths, encoders)
+    segments = {'encoders': encoders, 'mean': mean, 'std': std}
+    segments['centers'] = fit_centers(paths, segments)
+    # профили копятся счетчиками по кускам, так что проход по данным один
+    counts = sum_counts([
+        segment_counts(segments, chunk)
+        for chunk in iter_chunks(paths, READ_COLUMNS)
+    ])
+
+    # сегменты нумеруются от дешевого к дорогому, центры без строк выбрасываются
+    order = make_profiles(counts).sort_values('price_median')['segment'].to_numpy() - 1
+    position = np.full(len(segments['centers']), -1)
+    position[order] = np.arange(len(order))
+    counts['segment'] = position[counts['segment'].to_numpy()]
+    segments['centers'] = segments['centers'][order]
+    # таблица счетчиков и число строк у центров остаются в индексе для update_segments
+    segments['counts'] = counts
+    segments['profiles'] = make_profiles(counts)
+    segments['center_counts'] = segments['profiles']['devices'].to_numpy(dtype=float)
+    return segments
+
+
+def update_segments(segments, delta):
+    # дельту досчитываем по сохраненным центрам и счетчикам: масштаб признаков остается от полной сборки,
+    # центры сдвигаются только строками дельты, старые строки остаются в своих сегментах до prepare_data.py
+    features = segment_features(segments, delta[READ_COLUMNS].dropna())
+    centers, center_counts = partial_fit_centers(segments['centers'], segments['center_counts'], features)
+    segments = {**segments, 'centers': centers, 'center_counts': center_counts}
+    segments['counts'] = sum_counts([segments['counts'], segment_counts(segments, delta)])
+    segments['profiles'] = make_profiles(segments['counts'])
+    return segments
+
+
+def assign_segments(segments, configs):
+    # configs - DataFrame конфигураций с ценой; номер сегмента - ближайший центр, датасет не нужен
+    features = segment_features(segments, configs)
+    return segments['profiles']['segment'].to_numpy()[nearest_centers(segments['centers'], features)]
+
+
+@st.cache_resource(max_entries=2)
+def load_segments(data_version, _model_data=None):
+    # обычно сегменты уже собраны prepare_data.py; без них обучаем по текущему датасету, если есть энкодеры
+    segments = load_prepared_index('segments', data_version)
+    if segments is None and _model_data:
+        segments = make_segments(dataset_paths(read_manifest(data_version) or read_manifest()), _model_data)
+    return segments
@@ -0,0 +1,63 @@
+import threading
+
+import streamlit as st
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # одинаковые одновременные запросы ждут один вызов и получают его результат
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, *args, timeout=None, **kwargs):
+        # timeout - сколько ждать чужой вызов; если ведущий завис, делаем запрос сами
+        while True:
+            with self.lock:
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    self.calls[key] = call
+                    self.leaders += 1
+                else:
+                    self.shared += 1
+
+            if leader:
+                return self._lead(key, call, fn, *args, **kwargs)
+
+            if not call.done.wait(timeout):
+                with self.lock:
+                    self.timeouts += 1
+                return fn(*args, **kwargs)
+            if call.error is None:
+                return call.result
+            if isinstance(call.error, Exception):
+                raise call.error
+            # ведущего прервали (например, rerun в его сессии) - пробуем сами
+
+    def _lead(self, key, call, fn, *args, **kwargs):
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+
+@st.cache_resource
+def get_singleflight(name):
+    return SingleFlight()
@@ -0,0 +1,167 @@
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data import load_aggregate, has_aggregate
+
+# характеристики, которые покупатель хочет побольше, при цене поменьше
+PARETO_SPECS = ['cpu_cores', 'ram_gb', 'storage_gb', 'vram_gb', 'gpu_tier']
+PARETO_KEYS = ['device_type', 'brand'] + PARETO_SPECS
+# сколько кандидатов за раз сравнивается с окном в sort-filter-skyline
+BLOCK_ROWS = 1024
+# первые точки скайлайна (с наименьшей суммой) отсекают большинство кандидатов,
+# с остальным окном сверяются только выжившие
+STRONG_ROWS = 64
+PREFILTER_ROWS = 65536
+
+
+def skyline_2d(points):
+    # после сортировки по (x, y) точка не доминируется, только если ее y меньше всех y до нее
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    y = points[order, 1]
+    best_before = np.minimum.accumulate(np.concatenate([[np.inf], y[:-1]]))
+    return order[y < best_before]
+
+
+def monotone_score(points):
+    # сумма колонок, приведенных к [0, 1]: у доминирующей точки она строго меньше, чем у доминируемой
+    low, high = points.min(axis=0), points.max(axis=0)
+    return ((points - low) / np.where(high > low, high - low, 1)).sum(axis=1)
+
+
+def strong_prefilter(points):
+    # точки с самой маленькой суммой доминируют большую часть остальных - отсекаем их
+    # векторно до цикла по точкам
+    score = monotone_score(points)
+    strong_rows = np.argpartition(score, STRONG_ROWS)[:STRONG_ROWS] if len(points) > STRONG_ROWS else np.arange(len(points))
+    strong = points[strong_rows]
+    candidates = np.ones(len(points), dtype=bool)
+    for start in range(0, len(points), PREFILTER_ROWS):
+        chunk = points[start:start + PREFILTER_ROWS]
+        candidates[start:start + PREFILTER_ROWS] = ~not_worse(strong, chunk).any(axis=0)
+    # точки различны, так что "не хуже" - это доминирование, кроме самих сильных точек (каждая не хуже себя)
+    candidates[strong_rows] = True
+    return np.flatnonzero(candidates)
+
+
+def skyline_3d(points):
+    # сортируем по (x, y, z) и держим "лестницу" (y, z) уже найденных точек скайлайна:
+    # y по возрастанию, z по убыванию. точку доминирует кто-то из лестницы, только если
+    # у последней ступеньки с y <= y точки z тоже не больше
+    candidates = strong_prefilter(points)
+    points = points[candidates]
+    order = np.lexsort((points[:, 2], points[:, 1], points[:, 0]))
+    stair_y, stair_z, result = [], [], []
+    for i in order:
+        y, z = points[i, 1], points[i, 2]
+        step = bisect_right(stair_y, y)
+        if step and stair_z[step - 1] <= z:
+            continue
+        result.append(i)
+        # ступеньки, которые новая точка накрывает, больше не нужны
+        end = step
+        while end < len(stair_y) and stair_z[end] >= z:
+            end += 1
+        stair_y[step:end] = [y]
+        stair_z[step:end] = [z]
+    return candidates[np.array(result, dtype=np.int64)]
+
+
+def skyline_sfs(points):
+    # sort-filter-skyline: сортировка по monotone_score - доминирующая точка всегда идет раньше доминируемой,
+    # поэтому каждый блок кандидатов сверяется только с уже найденным скайлайном и сам с собой
+    order = np.argsort(monotone_score(points), kind='stable')
+    window = np.empty((0, points.shape[1]))
+    result = []
+    for start in range(0, len(order), BLOCK_ROWS):
+        block_rows = order[start:start + BLOCK_ROWS]
+        block = points[block_rows]
+        for part in (window[:STRONG_ROWS], window[STRONG_ROWS:]):
+            if len(part) and len(block):
+                dominated = not_worse(part, block).any(axis=0)
+                block_rows, block = block_rows[~dominated], block[~dominated]
+        # внутри блока: точки различны, поэтому "все координаты не больше" у другой точки - это доминирование
+        inside = not_worse(block, block)
+        np.fill_diagonal(inside, False)
+        survivors = ~inside.any(axis=0)
+        result.append(block_rows[survivors])
+        window = np.concatenate([window, block[survivors]])
+    return np.concatenate(result)
+
+
+def not_worse(a, b):
+    # [i, j] - a[i] не хуже b[j] по всем колонкам; по колонке за раз, без трехмерного массива
+    result = a[:, None, 0] <= b[None, :, 0]
+    for col in range(1, a.shape[1]):
+        result &= a[:, None, col] <= b[None, :, col]
+    return result
+
+
+def skyline_brute(points):
+    # O(n^2) для проверки и сравнения в бенчмарке
+    dominated = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), BLOCK_ROWS):
+        block = points[start:start + BLOCK_ROWS]
+        better = (points[:, None, :] < block[None, :, :]).any(axis=2)
+        dominated[start:start + BLOCK_ROWS] = (not_worse(points, block) & better).any(axis=0)
+    return np.flatnonzero(~dominated)
+
+
+SKYLINE_METHODS = {
+    '2d': skyline_2d,
+    '3d': skyline_3d,
+    'sfs': skyline_sfs,
+    'brute': skyline_brute,
+}
+
+
+def skyline(points, method=None):
+    # номера строк points, которые никто не доминирует (по всем колонкам чем меньше, тем лучше).
+    # одинаковые точки друг друга не доминируют: считаем по уникальным и раздаем результат всем копиям
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0:
+        return np.array([], dtype=np.int64)
+    # np.unique(axis=0) на миллионе строк в разы медленнее lexsort
+    order = np.lexsort(points.T[::-1])
+    ordered = points[order]
+    first = np.concatenate([[True], (np.diff(ordered, axis=0) != 0).any(axis=1)])
+    unique = ordered[first]
+    inverse = np.empty(len(points), dtype=np.int64)
+    inverse[order] = np.cumsum(first) - 1
+
+    dims = unique.shape[1]
+    method = method or ('2d' if dims == 2 else '3d' if dims == 3 else 'sfs')
+    on_skyline = np.zeros(len(unique), dtype=bool)
+    on_skyline[SKYLINE_METHODS[method](unique)] = True
+    return np.flatnonzero(on_skyline[inverse])
+
+
+def build_pareto_cells(df):
+    # самое дешевое устройство на каждую комбинацию (тип, бренд, характеристики): дороже с теми же
+    # характеристиками на границу не попадет никогда, а комбинаций на порядки меньше, чем строк
+    cells = df.loc[df.groupby(PARETO_KEYS, observed=True)['price'].idxmin(), PARETO_KEYS + ['model', 'price']]
+    return cells.sort_values(PARETO_KEYS).reset_index(drop=True)
+
+
+def merge_pareto_cells(previous, delta):
+    cells = pd.concat([previous, delta], ignore_index=True).sort_values('price', kind='stable')
+    return cells.drop_duplicates(PARETO_KEYS).sort_values(PARETO_KEYS).reset_index(drop=True)
+
+
+def pareto_frontier(cells, specs=PARETO_SPECS, device_type=None, brands=None):
+    if device_type:
+        cells = cells[cells['device_type'] == device_type]
+    if brands:
+        cells = cells[cells['brand'].isin(brands)]
+    # цену минимизируем, характеристики максимизируем - берем их со знаком минус
+    points = np.column_stack([cells['price'].to_numpy(dtype=float)] + [-cells[col].to_numpy(dtype=float) for col in specs])
+    return cells.iloc[skyline(points)].sort_values('price').reset_index(drop=True)
+
+
+@st.cache_data(max_entries=64)
+def load_pareto_frontier(_df, specs, device_type, brands, data_version):
+    # кэш на версию данных и набор фильтров; ячейки обычно уже посчитаны prepare_data.py
+    cells = load_aggregate('pareto_cells') if has_aggregate('pareto_cells') else build_pareto_cells(_df)
+    return pareto_frontier(cells, list(specs), device_type, list(brands))
@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from data import load_value_counts
+
+# графики страницы статистики: ключ -> функция, строящая фигуру по датасету.
+# страница и render_snapshots.py строят их одним и тем же кодом
+
+
+def chart_device_type(df):
+    device_counts = load_value_counts('device_type', df)
+    fig = px.pie(
+        device_counts,
+        values=device_counts.values,
+        names=device_counts.index,
+        title='Распределение по типу устройств',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+
+def chart_brand(df):
+    brand_counts = load_value_counts('brand', df).head(10)
+    return px.bar(
+        brand_counts,
+        x=brand_counts.values,
+        y=brand_counts.index,
+        orientation='h',
+        title='Топ-10 производителей',
+        labels={'x': 'Количество устройств', 'y': 'Бренд'},
+        color=brand_counts.values,
+        color_continuous_scale='Blues'
+    )
+
+
+def chart_os(df):
+    os_counts = load_value_counts('os', df).head(8)
+    return px.pie(
+        os_counts,
+        values=os_counts.values,
+        names=os_counts.index,
+        title='Распределение операционных систем',
+        hole=0.4
+    )
+
+
+def chart_form_factor(df):
+    form_factor_counts = load_value_counts('form_factor', df)
+    fig = px.bar(
+        form_factor_counts,
+        x=form_factor_counts.index,
+        y=form_factor_counts.values,
+        title='Распределение по форм-факторам',
+        labels={'x': 'Форм-фактор', 'y': 'Количество'},
+        color=form_factor_counts.values,
+        color_continuous_scale='Viridis'
+    )
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def pie_chart(col, title, sort_index=False, head=None):
+    def build(df):
+        counts = load_value_counts(col, df)
+        if sort_index:
+            counts = counts.sort_index()
+        if head:
+            counts = counts.head(head)
+        return px.pie(counts, values=counts.values, names=counts.index, title=title)
+    return build
+
+
+def bar_chart(col, title, sort_index=False, head=None, labels=None, color_scale=None):
+    def build(df):
+        counts = load_value_counts(col, df)
+        if sort_index:
+            counts = counts.sort_index()
+        if head:
+            counts = counts.head(head)
+        options = {'color': counts.values}
+        if labels:
+            options = {'labels': labels}
+        if color_scale:
+            options['color_continuous_scale'] = color_scale
+        return px.bar(counts, x=counts.index, y=counts.values, title=title, **options)
+    return build
+
+
+def group_chart(col, bins, labels, title):
+    def build(df):
+        counts = load_value_counts(col, df)
+        group_counts = counts.groupby(
+            pd.cut(counts.index, bins=bins, labels=labels), observed=False
+        ).sum().sort_values(ascending=False)
+        return px.bar(
+            group_counts,
+            x=group_counts.index,
+            y=group_counts.values,
+            title=title,
+            color=group_counts.values
+        )
+    return build
+
+
+def chart_resolution(df):
+    resolution_counts = load_value_counts('resolution', df).head(10)
+    return px.bar(
+        resolution_counts,
+        x=resolution_counts.values,
+        y=resolution_counts.index,
+        orientation='h',
+        title='Топ-10 разрешений экранов',
+        color=resolution_counts.values
+    )
+
+
+def histogram_chart(col, nbins, title, color, labels=None):
+    # корзины считаем на сервере: в браузер уходит nbins столбиков, а не миллион точек
+    def build(df):
+        values = df[col].dropna().to_numpy()
+        counts, edges = np.histogram(values, bins=nbins)
+        fig = px.bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            title=title,
+            labels={'x': (labels or {}).get(col, col), 'y': 'count'},
+            color_discrete_sequence=[color]
+        )
+        fig.update_traces(width=edges[1] - edges[0] if len(edges) > 1 else None)
+        fig.update_layout(bargap=0, showlegend=False)
+        return fig
+    return build
+
+
+def chart_price_by_brand(df):
+    # квартили и усы как у px.box, но посчитанные здесь; выбросы точками не рисуем
+    top_brands = load_value_counts('brand', df).head(10).index
+    prices = df.loc[df['brand'].isin(top_brands), ['brand', 'price']]
+    stats = prices.groupby('brand')['price'].quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    bounds = prices.groupby('brand')['price'].agg(['min', 'max'])
+    stats['lowerfence'] = np.maximum(stats['q1'] - 1.5 * iqr, bounds['min'])
+    stats['upperfence'] = np.minimum(stats['q3'] + 1.5 * iqr, bounds['max'])
+    stats = stats.reindex([brand for brand in top_brands if brand in stats.index])
+
+    fig = go.Figure(go.Box(
+        x=stats.index,
+        q1=stats['q1'], median=stats['median'], q3=stats['q3'],
+        lowerfence=stats['lowerfence'], upperfence=stats['upperfence'],
+        name='price'
+    ))
+    fig.update_layout(
+        title='Распределение цен по топ-брендам',
+        xaxis_title='Бренд',
+        yaxis_title='Цена ($)',
+        showlegend=False
+    )
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+STATISTICS_CHARTS = {
+    'device_type': chart_device_type,
+    'brand': chart_brand,
+    'os': chart_os,
+    'form_factor': chart_form_factor,
+    'cpu_brand': pie_chart('cpu_brand', 'Бренды процессоров'),
+    'cpu_tier': bar_chart('cpu_tier', 'Уровни процессоров'),
+    'cpu_cores': bar_chart('cpu_cores', 'Распределение по количеству ядер', sort_index=True,
+                           labels={'x': 'Количество ядер', 'y': 'Устройств'}),
+    'ram_gb': bar_chart('ram_gb', 'Объем оперативной памяти (ГБ)', sort_index=True, color_scale='Teal'),
+    'storage_type': pie_chart('storage_type', 'Типы накопителей'),
+    # увы нет поддержки латеха, пришлось вставлять юникод символы
+    'storage_gb': group_chart('storage_gb', [0, 256, 512, 1024, 2048, float('inf')],
+                              ['≤256GB', '257-512GB', '513GB-1TB', '1-2TB', '>2TB'], 'Группы объемов хранилища'),
+    'storage_drive_count': pie_chart('storage_drive_count', 'Количество накопителей', sort_index=True),
+    'gpu_brand': pie_chart('gpu_brand', 'Бренды видеокарт'),
+    'gpu_tier': bar_chart('gpu_tier', 'Уровни видеокарт'),
+    'vram_gb': bar_chart('vram_gb', 'Объем видеопамяти (ГБ)', sort_index=True),
+    'display_type': pie_chart('display_type', 'Типы дисплеев', head=8),
+    'display_size_in': group_chart('display_size_in', [0, 13, 15, 17, 20, float('inf')],
+                                   ['≤13"', '14-15"', '16-17"', '18-20"', '>20"'], 'Размеры дисплеев'),
+    'resolution': chart_resolution,
+    'refresh_hz': bar_chart('refresh_hz', 'Частота обновления (Гц)', sort_index=True, head=15),
+    'price': histogram_chart('price', 50, 'Распределение цен', '#FF6B6B', labels={'price': 'Цена ($)'}),
+    'price_by_brand': chart_price_by_brand,
+    'battery_wh': histogram_chart('battery_wh', 30, 'Емкость батареи (Wh)', '#4ECDC4'),
+    'charger_watts': histogram_chart('charger_watts', 30, 'Мощность зарядки (Вт)', '#45B7D1'),
+    'psu_watts': histogram_chart('psu_watts', 30, 'Блоки питания (Вт)', '#96CEB4'),
+    'weight_kg': histogram_chart('weight_kg', 30, 'Вес устройств (кг)', '#FECA57'),
+    'warranty_months': bar_chart('warranty_months', 'Срок гарантии (месяцев)', sort_index=True),
+    'wifi': pie_chart('wifi', 'Наличие Wi-Fi'),
+    'bluetooth': pie_chart('bluetooth', 'Наличие Bluetooth'),
+}
@@ -0,0 +1,77 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data import data_ready, load_prepared_dataset
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+CHUNK_ROWS = 500_000
+FIXTURE_PATH = "fixtures/computer_prices_sample.csv"
+
+# непрерывные колонки шумим (логнормально, в долях), чтобы строки не повторяли исходник один в один
+JITTER = {
+    'price': 0.08,
+    'cpu_base_ghz': 0.03,
+    'cpu_boost_ghz': 0.03,
+    'battery_wh': 0.05,
+    'weight_kg': 0.05,
+}
+
+
+def parse_size(size):
+    return SIZES.get(size.lower()) or int(size)
+
+
+def load_source(path=None):
+    # строки берем из подготовленного датасета, а без него - из тестового CSV
+    if path:
+        return pd.read_csv(path)
+    if data_ready():
+        return load_prepared_dataset()
+    return pd.read_csv(FIXTURE_PATH)
+
+
+def generate_chunk(source, rows, variants, rng):
+    # бутстрэп целых строк сохраняет распределения колонок и связи между ними (бренд - тип - цена)
+    chunk = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+    for col, scale in JITTER.items():
+        chunk[col] = (chunk[col] * rng.lognormal(0, scale, rows)).round(2)
+
+    # число разных моделей растет вместе с размером, как в настоящем каталоге
+    if variants > 1:
+        series = rng.integers(0, variants, rows)
+        suffix = pd.Series(series).map(lambda i: f" Gen{i}" if i else "")
+        chunk['model'] = chunk['model'].astype(str) + suffix
+    return chunk
+
+
+def generate(rows, out_path, source=None, seed=42):
+    rng = np.random.default_rng(seed)
+    variants = max(1, rows // len(source))
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+    written = 0
+    while written < rows:
+        chunk = generate_chunk(source, min(CHUNK_ROWS, rows - written), variants, rng)
+        chunk.to_csv(out_path, index=False, mode="w" if written == 0 else "a", header=written == 0)
+        written += len(chunk)
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Синтетический computer_prices_all.csv нужного размера")
+    parser.add_argument("--rows", default="10k", help=f"число строк или {', '.join(SIZES)}")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--source", help="CSV, распределения которого повторяем")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    generate(rows, args.out, load_source(args.source), args.seed)
+    print(f"{args.out}: {rows} строк")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,128 @@
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
 
-def draw_plot(filtered_df, min_year, max_year, chart_type):
+from metrics import span
 
-    if filtered_df.empty:
+
+def dynamics_defaults(yearly_counts):
+    # вид страницы динамики, который видит каждый новый посетитель; его же отрисовывает render_snapshots.py
+    brands = sorted(yearly_counts['brand'].unique())
+    return {
+        'min_year': int(yearly_counts['release_year'].min()),
+        'max_year': int(yearly_counts['release_year'].max()),
+        'brands': brands[:5],
+        'chart_type': "Линейный",
+    }
+
+
+def select_years_brands(table, min_year, max_year, brands):
+    return table[
+        (table['release_year'] >= min_year) &
+        (table['release_year'] <= max_year) &
+        (table['brand'].isin(brands))
+        ]
+
+
+def build_plot(yearly_data, min_year, max_year, chart_type):
+    if chart_type == "Линейный":
+        fig = px.line(
+            yearly_data,
+            x='release_year',
+            y='count',
+            color='brand',
+            title=f'Динамика по годам ({min_year}-{max_year})',
+            labels={
+                'release_year': 'Год',
+                'count': 'Количество',
+                'brand': 'Производитель'
+            },
+            markers=True
+        )
+    else:
+        fig = px.bar(
+            yearly_data,
+            x='release_year',
+            y='count',
+            color='brand',
+            title=f'Динамика по годам ({min_year}-{max_year})',
+            labels={
+                'release_year': 'Год',
+                'count': 'Количество',
+                'brand': 'Производитель'
+            },
+            barmode='group'
+        )
+
+    fig.update_layout(
+        hovermode='x unified',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+
+@span("figure", chart="dynamics")
+def draw_plot(yearly_data, min_year, max_year, chart_type, fig=None):
+
+    if yearly_data.empty:
         st.warning("Нет данных")
     else:
-        yearly_data = filtered_df.groupby(['release_year', 'brand']).size().reset_index(name='count')
         st.subheader("Динамика выпуска компухтеров")
+        # fig передается готовым из снимка страницы, иначе строим
+        if fig is None:
+            fig = build_plot(yearly_data, min_year, max_year, chart_type)
+        st.plotly_chart(fig, use_container_width=True)
+
 
-        if chart_type == "Линейный":
-            fig = px.line(
-                yearly_data,
-                x='release_year',
-                y='count',
-                color='brand',
-                title=f'Динамика по годам ({min_year}-{max_year})',
-                labels={
-                    'release_year': 'Год',
-                    'count': 'Количество',
-                    'brand': 'Производитель'
-                },
-                markers=True
-            )
-        else:
-            fig = px.bar(
-                yearly_data,
-                x='release_year',
-                y='count',
-                color='brand',
-                title=f'Динамика по годам ({min_year}-{max_year})',
-                labels={
-                    'release_year': 'Год',
-                    'count': 'Количество',
-                    'brand': 'Производитель'
-                },
-                barmode='group'
-            )
-
-        fig.update_layout(
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
+def build_price_trend(trend, min_year, max_year):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=trend['release_year'], y=trend['p90'],
+        line=dict(width=0), showlegend=False, hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend['release_year'], y=trend['p10'],
+        fill='tonexty', line=dict(width=0), name='Разброс P10-P90',
+        customdata=trend['spread'], hovertemplate='P10: $%{y:,.0f}<br>Разброс: $%{customdata:,.0f}'
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend['release_year'], y=trend['median'],
+        mode='lines+markers', name='Медиана', hovertemplate='$%{y:,.0f}'
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend['release_year'], y=trend['p90'],
+        mode='lines+markers', name='P90', line=dict(dash='dash'), hovertemplate='$%{y:,.0f}'
+    ))
+
+    fig.update_layout(
+        title=f'Цены по годам ({min_year}-{max_year})',
+        xaxis_title='Год',
+        yaxis_title='Цена, $',
+        hovermode='x unified',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
         )
+    )
+    return fig
+
+
+@span("figure", chart="price_trend")
+def draw_price_trend(trend, min_year, max_year, fig=None):
 
+    if fig is None and trend.empty:
+        st.warning("Нет данных")
+    else:
+        st.subheader("Динамика цен")
+        if fig is None:
+            fig = build_price_trend(trend, min_year, max_year)
         st.plotly_chart(fig, use_container_width=True)
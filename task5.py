@@ -1,9 +1,19 @@
 import json
+import os
 
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from metrics import span, cache_request, cache_miss
+from singleflight import get_singleflight
+
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODE_TIMEOUT_SECONDS = 10
+# ведущий singleflight сам ограничен таймаутами requests (соединение и чтение) и паузой после запроса;
+# ждущие ждут дольше, иначе на его таймауте они одновременно повторят тот же запрос
+GEOCODE_WAIT_SECONDS = 3 * GEOCODE_TIMEOUT_SECONDS
+
 def get_fallback_company_info(brand_name, brand_stats):
     # если что-то сломаетчя
     fallback_data = {
@@ -36,35 +46,44 @@ def get_fallback_company_info(brand_name, brand_stats):
     return info
 
 
+def fetch_location(brand_name):
+    import requests
+    import time
+
+    search_query = f"{brand_name}"
+    params = {
+        'q': search_query,
+        'limit': 1,
+        'format': 'json'
+    }
+
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'application/json',
+        'Referer': 'https://openstreetmap.org'
+    }
+    response = requests.get(NOMINATIM_URL, params=params, headers=headers, timeout=GEOCODE_TIMEOUT_SECONDS)
+
+    print(brand_name)
+
+    time.sleep(1)
+    return response
+
+
 @st.cache_data(ttl=3600)
 def get_company_info(brand_name, brand_stats):
+    cache_miss("geocode")
     try:
-        import requests
-        import time
-
         base_info = {
             'brand': brand_name,
             'devices_in_dataset': brand_stats.get(brand_name, 0)
         }
 
-        search_query = f"{brand_name}"
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            'q': search_query,
-            'limit': 1,
-            'format': 'json'
-        }
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json',
-            'Referer': 'https://openstreetmap.org'
-        }
-        response = requests.get(url, params=params, headers=headers)
-
-        print(brand_name)
-
-        time.sleep(1)
+        # одновременные промахи кэша по одному бренду ждут один запрос к Nominatim
+        with span("geocode"):
+            response = get_singleflight("geocode").do(
+                brand_name, fetch_location, brand_name, timeout=GEOCODE_WAIT_SECONDS
+            )
 
         if response.status_code == 200:
             data = response.json()
@@ -84,14 +103,15 @@ def get_company_info(brand_name, brand_stats):
     except Exception as e:
         st.error(f"Ошибка: {e}")
         return get_fallback_company_info(brand_name, brand_stats)
-def build_map(unique_brands, df, brand_stats):
+def build_map(unique_brands, brand_profiles, brand_stats):
     st.subheader("Штаб-квартиры производителей")
 
-    with st.spinner("Получаем местоположение..."):
+    with st.spinner("Получаем местоположение..."), span("geocoding"):
         manufacturers_data = []
         progress_bar = st.progress(0)
 
         for i, brand in enumerate(unique_brands[:10]):
+            cache_request("geocode")
             brand_info = get_company_info(brand, brand_stats)
             manufacturers_data.append(brand_info)
             progress_bar.progress((i + 1) / min(10, len(unique_brands)))
@@ -104,84 +124,95 @@ def build_map(unique_brands, df, brand_stats):
         api_success_count = map_df['found_via_api'].sum()
         st.info(f"Данные получены через API для {api_success_count} из {len(map_df)} производителей")
 
-        col_map1, col_map2 = st.columns([3, 1])
-
-        with col_map2:
-            st.markdown("Настройки карты")
-            map_style = st.selectbox(
-                "Стиль карты:",
-                ["open-street-map", "carto-darkmatter"],
-                index=0
-            )
-
-
-        with col_map1:
-            display_df = map_df
-            display_df = display_df[display_df['found_via_api'] == True]
-            if display_df.empty:
-                st.warning("Нет данных, полученных через API")
-                display_df = map_df
-
-
-            fig = px.scatter_mapbox(
-                display_df,
-                lat="lat",
-                lon="lon",
-                hover_name="brand",
-                hover_data={
-                    'lat': False,
-                    'lon': False,
-                    'brand': True,
-                    'city': True,
-                    'devices_in_dataset': True,
-                    'found_via_api': True
-                },
-                custom_data=['brand', 'city', 'devices_in_dataset', 'found_via_api'],
-                size=None,
-                size_max= 20,
-                color="found_via_api",
-                color_discrete_map={True: '#2E86AB', False: '#A23B72'},
-                zoom=1,
-                height=500,
-                title="Географическое расположение штаб-квартир производителей"
-            )
-
-
-
-            fig.update_layout(mapbox_style=map_style)
-            fig.update_layout(margin={"r": 0, "t": 30, "l": 0, "b": 0})
-            fig.update_layout(legend_title_text="Данные с API")
-
-            st.plotly_chart(fig, use_container_width=True)
+        draw_headquarters_map(map_df)
+        show_manufacturers(map_df, brand_profiles)
+    else:
+        st.error("эх]'")
 
-        st.subheader("Информация о производителях")
 
-        search_brand = st.text_input("Поиск производителя:", placeholder="Введите название бренда...")
+# смена стиля карты перерисовывает только карту, геокодинг и остальная страница не трогаются
+@st.fragment
+@span("figure", chart="map")
+def draw_headquarters_map(map_df):
+    col_map1, col_map2 = st.columns([3, 1])
 
-        display_manufacturers = map_df
-        if search_brand:
-            display_manufacturers = display_manufacturers[
-                display_manufacturers['brand'].str.contains(search_brand, case=False, na=False)
-            ]
+    with col_map2:
+        st.markdown("Настройки карты")
+        map_style = st.selectbox(
+            "Стиль карты:",
+            ["open-street-map", "carto-darkmatter"],
+            index=0
+        )
 
-        for _, manufacturer in display_manufacturers.iterrows():
-            with st.expander(f"{manufacturer['brand']} - {manufacturer['city'].split(',')[0]}"):
-                col_info1, col_info2 = st.columns(2)
 
-                with col_info1:
-                    st.write(f"Местоположение: {manufacturer['city']}")
-                    st.write(f"Устройств в датасете: {manufacturer['devices_in_dataset']}")
+    with col_map1:
+        display_df = map_df
+        display_df = display_df[display_df['found_via_api'] == True]
+        if display_df.empty:
+            st.warning("Нет данных, полученных через API")
+            display_df = map_df
 
-                    data_source = "API" if manufacturer['found_via_api'] else "Резервные данные"
-                    st.write(f"Источник данных: {data_source}")
 
-                with col_info2:
-                    brand_models = df[df['brand'] == manufacturer['brand']]
-                    if not brand_models.empty:
-                        st.write("Статистика")
-                        st.write(f"Средняя цена {brand_models['price'].mean():,.2f}")
-                        st.write(f"Популярный тип {brand_models['device_type'].mode().iloc[0]}")
-                        st.write(
-                            f"Годы выпуска: {brand_models['release_year'].min()}-{brand_models['release_year'].max()}")
-    else:
-        st.error("эх]'")
\ No newline at end of file
+        fig = px.scatter_mapbox(
+            display_df,
+            lat="lat",
+            lon="lon",
+            hover_name="brand",
+            hover_data={
+                'lat': False,
+                'lon': False,
+                'brand': True,
+                'city': True,
+                'devices_in_dataset': True,
+                'found_via_api': True
+            },
+            custom_data=['brand', 'city', 'devices_in_dataset', 'found_via_api'],
+            size=None,
+            size_max= 20,
+            color="found_via_api",
+            color_discrete_map={True: '#2E86AB', False: '#A23B72'},
+            zoom=1,
+            height=500,
+            title="Географическое расположение штаб-квартир производителей"
+        )
+
+
+
+        fig.update_layout(mapbox_style=map_style)
+        fig.update_layout(margin={"r": 0, "t": 30, "l": 0, "b": 0})
+        fig.update_layout(legend_title_text="Данные с API")
+
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# поиск по брендам перерисовывает только список
+@st.fragment
+def show_manufacturers(map_df, brand_profiles):
+    st.subheader("Информация о производителях")
+
+    search_brand = st.text_input("Поиск производителя:", placeholder="Введите название бренда...")
+
+    display_manufacturers = map_df
+    if search_brand:
+        display_manufacturers = display_manufacturers[
+            display_manufacturers['brand'].str.contains(search_brand, case=False, na=False)
+        ]
+
+    for _, manufacturer in display_manufacturers.iterrows():
+        with st.expander(f"{manufacturer['brand']} - {manufacturer['city'].split(',')[0]}"):
+            col_info1, col_info2 = st.columns(2)
+
+            with col_info1:
+                st.write(f"Местоположение: {manufacturer['city']}")
+                st.write(f"Устройств в датасете: {manufacturer['devices_in_dataset']}")
+
+                data_source = "API" if manufacturer['found_via_api'] else "Резервные данные"
+                st.write(f"Источник данных: {data_source}")
+
+            with col_info2:
+                if manufacturer['brand'] in brand_profiles.index:
+                    profile = brand_profiles.loc[manufacturer['brand']]
+                    st.write("Статистика")
+                    st.write(f"Средняя цена {profile['mean_price']:,.2f}")
+                    st.write(f"Популярный тип {profile['popular_type']}")
+                    st.write(f"Годы выпуска: {profile['year_min']}-{profile['year_max']}")
@@ -3,75 +3,109 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_error, r2_score
-import pandas as pd
 import numpy as np
 import pickle
+import os
 
+from data import DATA_DIR, load_data
+from metrics import span, cache_miss
+from forest_arrays import FOREST_ARRAYS, export_forest, save_forest_arrays, load_forest_arrays, verify_forest_arrays
 
-@st.cache_resource
-def train_price_model(df):
-    try:
-        df_model = df.copy()
+MODEL_PATH = os.path.join(DATA_DIR, 'price_model.pkl')
+ESTIMATOR_PATH = os.path.join(DATA_DIR, 'price_model_estimator.pkl')
+FOREST_ARRAYS_PATH = os.path.join(DATA_DIR, 'price_model_arrays')
+CATEGORICAL_COLUMNS = ['brand', 'device_type', 'cpu_brand', 'gpu_brand']
+
+
+@span("model_train")
+def fit_price_model(df):
+    # обучение без streamlit, его же вызывает prepare_data.py
+    df_model = df.copy()
+
+    feature_columns = [
+        'brand', 'device_type', 'cpu_brand', 'cpu_cores', 'ram_gb',
+        'storage_gb', 'gpu_brand', 'display_size_in'
+    ]
+
+    df_model = df_model[feature_columns + ['price']].dropna()
 
-        feature_columns = [
-            'brand', 'device_type', 'cpu_brand', 'cpu_cores', 'ram_gb',
-            'storage_gb', 'gpu_brand', 'display_size_in'
-        ]
+    label_encoders = {}
+    for col in CATEGORICAL_COLUMNS:
+        le = LabelEncoder()
+        df_model[col] = le.fit_transform(df_model[col].astype(str))
+        label_encoders[col] = le
 
-        df_model = df_model[feature_columns + ['price']].dropna()
+    X = df_model[feature_columns]
+    y = df_model['price']
 
-        label_encoders = {}
-        for col in ['brand', 'device_type', 'cpu_brand', 'gpu_brand']:
-            le = LabelEncoder()
-            df_model[col] = le.fit_transform(df_model[col].astype(str))
-            label_encoders[col] = le
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
 
-        X = df_model[feature_columns]
-        y = df_model['price']
+    model = RandomForestRegressor(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42,
+        n_jobs=-1
+    )
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
+    model.fit(X_train, y_train)
 
-        model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1
-        )
+    y_pred = model.predict(X_test)
+    mae = mean_absolute_error(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
 
-        model.fit(X_train, y_train)
+    model_data = {
+        'model': model,
+        'label_encoders': label_encoders,
+        'feature_columns': feature_columns,
+        'metrics': {'mae': mae, 'r2': r2},
+        'feature_importances': dict(zip(feature_columns, model.feature_importances_))
+    }
 
-        y_pred = model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+    # сам лес sklearn нужен только чтобы пересобрать плоские массивы, поэтому лежит отдельно
+    # и не грузится в каждый процесс вместе с энкодерами
+    with open(ESTIMATOR_PATH, 'wb') as f:
+        pickle.dump(model, f)
+    with open(MODEL_PATH, 'wb') as f:
+        pickle.dump({k: v for k, v in model_data.items() if k != 'model'}, f)
 
-        model_data = {
-            'model': model,
-            'label_encoders': label_encoders,
-            'feature_columns': feature_columns,
-            'metrics': {'mae': mae, 'r2': r2},
-            'feature_importances': dict(zip(feature_columns, model.feature_importances_))
-        }
+    # плоская копия леса для пакетного предсказания, проверяем что ответы совпадают
+    forest = export_forest(model)
+    verify_forest_arrays(forest, model, X_test)
+    save_forest_arrays(forest, FOREST_ARRAYS_PATH)
 
-        with open('price_model.pkl', 'wb') as f:
-            pickle.dump(model_data, f)
+    return model_data
 
-        return model_data
 
+@st.cache_resource
+def train_price_model(df):
+    try:
+        return fit_price_model(df)
     except Exception as e:
         st.error(f"Ошибка: {e}")
         return None
 
 
-@st.cache_resource
+def model_version():
+    # время записи файла модели: после переобучения в prepare_data.py кэши ниже промахиваются
+    # и энкодеры с лесом берутся от одной и той же модели
+    return os.path.getmtime(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+
+
 def load_price_model(df):
+    return load_price_model_version(df, model_version())
+
+
+@st.cache_resource(max_entries=2)
+def load_price_model_version(df, version):
+    cache_miss("price_model")
     try:
-        with open('price_model.pkl', 'rb') as f:
+        with span("model_load"), open(MODEL_PATH, 'rb') as f:
             model_data = pickle.load(f)
 
         st.success("Модель загружена из файла!")
-        return model_data
+        return {**model_data, 'version': version}
 
     except FileNotFoundError:
         st.info("Обучаем новую модель...")
@@ -81,6 +115,49 @@ def load_price_model(df):
         return None
 
 
+def read_price_model():
+    # энкодеры и метрики последней обученной модели, без streamlit (для prepare_data.py и refresh_data.py)
+    if not os.path.exists(MODEL_PATH):
+        return None
+    with open(MODEL_PATH, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_estimator(model_data):
+    if 'model' in model_data:
+        return model_data['model']
+    with open(ESTIMATOR_PATH, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_price_forest(model_data):
+    return load_price_forest_version(model_data, model_data.get('version'))
+
+
+@st.cache_resource(max_entries=2)
+def load_price_forest_version(_model_data, version):
+    # лес старой модели вытесняется из кэша, его mmap закрываются
+    values_path = os.path.join(FOREST_ARRAYS_PATH, 'value.npy')
+    # массивы старого формата (без missing_left) тоже пересобираем
+    exported = all(os.path.exists(os.path.join(FOREST_ARRAYS_PATH, f"{name}.npy")) for name in FOREST_ARRAYS)
+    if not exported or os.path.getmtime(values_path) < os.path.getmtime(MODEL_PATH):
+        forest = export_forest(load_estimator(_model_data))
+        save_forest_arrays(forest, FOREST_ARRAYS_PATH)
+    return load_forest_arrays(FOREST_ARRAYS_PATH)
+
+
+def encode_features(model_data, input_df):
+    encoded = input_df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        le = model_data['label_encoders'][col]
+        # незнакомые значения кодируем нулем, как раньше
+        known = encoded[col].astype(str).isin(le.classes_)
+        codes = np.zeros(len(encoded), dtype=int)
+        if known.any():
+            codes[known.to_numpy()] = le.transform(encoded.loc[known, col].astype(str))
+        encoded[col] = codes
+    return encoded[model_data['feature_columns']]
+
+
 if __name__ == "__main__":
-    df = pd.read_csv("1/computer_prices_all.csv")
-    train_price_model(df)
+    fit_price_model(load_data())
@@ -1,14 +1,24 @@
+import json
+
 import requests
 from dotenv import load_dotenv
 import os
+
+from metrics import span
+
 load_dotenv()
 
 identificator = os.getenv("ID")
 api_key = os.getenv("API_KEY")
+# можно подменить адрес на локальную заглушку
+completion_url = os.getenv("YANDEX_GPT_URL", "https://llm.api.cloud.yandex.net/foundationModels/v1/completion")
+
+
+def get_model_uri():
+   return f"gpt://{identificator}/yandexgpt-4-lite/latest"
 
-def get_yandex_gpt_openai_response(question, history):
 
-   print(identificator, api_key)
+def build_prompt(question, history, stream=False, summary=None, context=None):
    system_prompt = """Ты - эксперт по компьютерной технике и электронике. Твоя специализация:
    # - Компьютерные компоненты (процессоры, видеокарты, память)
    # - Ноутбуки и десктопы
@@ -21,6 +31,11 @@ def get_yandex_gpt_openai_response(question, history):
    # Используй конкретные примеры, сравнивай варианты, давай обоснованные рекомендации.
    # Если нужно, используй таблицы для сравнения характеристик."""
 
+   if context:
+      system_prompt += f"\n\nСправка по нашему датасету цен, опирайся на нее в ответе:\n{context}"
+   if summary:
+      system_prompt += f"\n\nКратко о начале разговора:\n{summary}"
+
    messages = [{
        "role": "system",
        "text": system_prompt
@@ -34,23 +49,29 @@ def get_yandex_gpt_openai_response(question, history):
                "role": "user",
                "text": question
            })
-   prompt = {
-       "modelUri": f"gpt://{identificator}/yandexgpt-4-lite/latest",
+   return {
+       "modelUri": get_model_uri(),
        "completionOptions": {
-           "stream": False,
+           "stream": stream,
            "temperature": 0.6,
            "maxTokens": "2000"
        },
        "messages": messages
    }
-   try:
-      url = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
-      headers = {
-          "Content-Type": "application/json",
-          "Authorization": f"Api-Key {api_key}"
-      }
 
-      response = requests.post(url, headers=headers, json=prompt)
+
+def get_headers():
+   return {
+       "Content-Type": "application/json",
+       "Authorization": f"Api-Key {api_key}"
+   }
+
+
+@span("llm", mode="sync")
+def get_yandex_gpt_openai_response(question, history, summary=None, context=None):
+   prompt = build_prompt(question, history, summary=summary, context=context)
+   try:
+      response = requests.post(completion_url, headers=get_headers(), json=prompt)
       if response.status_code == 200:
          result = response.json()
          return result['result']['alternatives'][0]['message']['text']
@@ -59,3 +80,32 @@ def get_yandex_gpt_openai_response(question, history):
          raise Exception(error_msg)
    except Exception as e:
       raise Exception(f"Yandex GPT error: {e}")
+
+
+def parse_stream_line(line, received):
+   # в потоке каждая строка - json с текстом ответа на текущий момент
+   if not line:
+      return "", received
+   text = json.loads(line)['result']['alternatives'][0]['message']['text']
+   # обычно приходит весь текст целиком, но на всякий случай понимаем и дельты
+   if text.startswith(received):
+      return text[len(received):], text
+   return text, received + text
+
+
+def stream_yandex_gpt_response(question, history, summary=None, context=None):
+   # генератор кусочков ответа
+   prompt = build_prompt(question, history, stream=True, summary=summary, context=context)
+   try:
+      with span("llm", mode="stream"), \
+            requests.post(completion_url, headers=get_headers(), json=prompt, stream=True) as response:
+         if response.status_code != 200:
+            raise Exception(f"API Error {response.status_code}: {response.text}")
+
+         received = ""
+         for line in response.iter_lines():
+            delta, received = parse_stream_line(line, received)
+            if delta:
+               yield delta
+   except Exception as e:
+      raise Exception(f"Yandex GPT error: {e}")
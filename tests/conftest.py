@@ -0,0 +1,31 @@
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mock_yandex
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def start_mock():
+    # заглушка completion API в отдельном процессе; возвращает адрес completion и /stats
+    processes = []
+
+    def start(**settings):
+        process, url, stats_url = mock_yandex.start_mock(free_port(), **settings)
+        processes.append(process)
+        return url, stats_url
+
+    yield start
+    for process in processes:
+        process.terminate()
+        process.join()
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import task5
+from singleflight import SingleFlight
+
+
+@pytest.fixture
+def nominatim(monkeypatch):
+    # заглушка Nominatim: считает запросы и отвечает через delay секунд
+    stub = {"requests": 0, "delay": 0.3}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stub["requests"] += 1
+            time.sleep(stub["delay"])
+            body = json.dumps([{"lat": "55.75", "lon": "37.62", "display_name": "Москва"}]).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:
+                # клиент уже ушел по таймауту
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(task5, "NOMINATIM_URL", f"http://127.0.0.1:{server.server_address[1]}/search")
+    task5.get_company_info.clear()
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def geocode(flight, brand):
+    # тот же вызов, что в task5.get_company_info, но без st.cache_data: его блокировка сама
+    # сводит одновременные промахи одного процесса к одному вызову и спрятала бы singleflight
+    return flight.do(brand, task5.fetch_location, brand, timeout=task5.GEOCODE_WAIT_SECONDS)
+
+
+def run_concurrently(fn, sessions):
+    barrier = threading.Barrier(sessions)
+    results = [None] * sessions
+
+    def session(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_geocode_shares_one_request(nominatim):
+    flight = SingleFlight()
+    responses = run_concurrently(lambda: geocode(flight, "Stub Brand"), 6)
+
+    assert nominatim["requests"] == 1
+    assert all(response.status_code == 200 for response in responses)
+    assert flight.leaders == 1
+    assert flight.shared == 5
+
+
+def test_slow_geocode_times_out_for_every_waiter(nominatim, monkeypatch):
+    nominatim["delay"] = 3
+    monkeypatch.setattr(task5, "GEOCODE_TIMEOUT_SECONDS", 0.3)
+    monkeypatch.setattr(task5, "GEOCODE_WAIT_SECONDS", 0.9)
+    flight = SingleFlight()
+
+    start = time.perf_counter()
+    results = run_concurrently(lambda: geocode(flight, "Stub Brand"), 4)
+
+    # ведущий падает по таймауту requests, ждущие получают ту же ошибку, никто не висит 3 секунды
+    assert time.perf_counter() - start < 2
+    assert all(isinstance(result, requests.exceptions.Timeout) for result in results)
+    assert nominatim["requests"] == 1
+
+
+def test_company_info_falls_back_after_timeout(nominatim, monkeypatch):
+    nominatim["delay"] = 3
+    monkeypatch.setattr(task5, "GEOCODE_TIMEOUT_SECONDS", 0.3)
+
+    info = task5.get_company_info("Dell", {"Dell": 3})
+
+    assert not info["found_via_api"]
+    assert info["city"].startswith("Раунд-Рок")
+
+
+def test_waiter_geocodes_itself_when_leader_hangs(nominatim):
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("Stub Brand", release.wait))
+    leader.start()
+    try:
+        while not flight.calls:
+            time.sleep(0.01)
+        response = flight.do("Stub Brand", task5.fetch_location, "Stub Brand", timeout=0.2)
+    finally:
+        release.set()
+        leader.join()
+
+    assert response.status_code == 200
+    assert flight.timeouts == 1
+    assert nominatim["requests"] == 1
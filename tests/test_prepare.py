@@ -0,0 +1,51 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "fixtures", "computer_prices_sample.csv")
+
+
+@pytest.fixture(scope="module")
+def prepared(tmp_path_factory):
+    # DATA_DIR читается при импорте модулей, поэтому prepare_data.py запускаем отдельным процессом
+    data_dir = tmp_path_factory.mktemp("data")
+    subprocess.run(
+        [sys.executable, "prepare_data.py", "--csv", FIXTURE],
+        cwd=ROOT, env={**os.environ, "DATA_DIR": str(data_dir)}, check=True, capture_output=True
+    )
+    with open(data_dir / "manifest.json", encoding="utf8") as f:
+        return data_dir, json.load(f)
+
+
+def test_manifest_version(prepared):
+    data_dir, manifest = prepared
+    assert manifest["version"] == 1
+    assert manifest["rows"] == len(pd.read_csv(FIXTURE))
+    assert (data_dir / "v1" / "manifest.json").exists()
+
+
+def test_dataset_rows_and_dtypes(prepared):
+    data_dir, manifest = prepared
+    source = pd.read_csv(FIXTURE)
+    df = pd.read_parquet(data_dir / manifest["dataset"])
+
+    assert len(df) == len(source)
+    assert list(df.columns) == list(source.columns)
+    assert {col: str(dtype) for col, dtype in df.dtypes.items()} == manifest["columns"]
+    assert df['price'].dtype.kind == 'f'
+
+
+def test_prepared_indexes_load(prepared):
+    data_dir, manifest = prepared
+    assert set(manifest["indexes"]) == {'similar', 'retrieval', 'search', 'percentiles', 'segments'}
+    for name, path in manifest["indexes"].items():
+        with open(data_dir / path, "rb") as f:
+            assert pickle.load(f), name
+    for name, path in manifest["aggregates"].items():
+        assert len(pd.read_parquet(data_dir / path)), name
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import requests
+
+import task7
+from chat_cache import ChatCache, make_cache_key
+from singleflight import SingleFlight
+
+
+def upstream_requests(stats_url):
+    return requests.get(stats_url).json()["requests"]
+
+
+def make_ask(cache, flight):
+    # тот же путь, что на странице чата: кэш, затем один общий запрос на одинаковые вопросы
+    def fetch(key, question):
+        answer = task7.get_yandex_gpt_openai_response(question, [])
+        cache.put(key, answer)
+        return answer
+
+    def ask(question):
+        key = make_cache_key(question, [], task7.get_model_uri())
+        answer = cache.get(key)
+        if answer is None:
+            answer = flight.do(key, fetch, key, question, timeout=10)
+        return answer
+
+    return ask
+
+
+def test_cache_miss_then_hit(start_mock, monkeypatch, tmp_path):
+    url, stats_url = start_mock(latency=0.05, tokens_per_second=1000, answer_tokens=10)
+    monkeypatch.setattr(task7, "completion_url", url)
+    cache = ChatCache(str(tmp_path / "cache.sqlite3"))
+    ask = make_ask(cache, SingleFlight())
+
+    first = ask("Игровой ноутбук до 1500$?")
+    assert upstream_requests(stats_url) == 1
+
+    # отличается только регистром и пунктуацией - тот же ключ
+    second = ask("игровой ноутбук до 1500$")
+    assert second == first
+    assert upstream_requests(stats_url) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_concurrent_identical_questions_share_one_call(start_mock, monkeypatch, tmp_path):
+    url, stats_url = start_mock(latency=0.5, tokens_per_second=1000, answer_tokens=10)
+    monkeypatch.setattr(task7, "completion_url", url)
+    flight = SingleFlight()
+    ask = make_ask(ChatCache(str(tmp_path / "cache.sqlite3")), flight)
+
+    sessions = 8
+    barrier = threading.Barrier(sessions)
+    answers = [None] * sessions
+
+    def session(i):
+        barrier.wait()
+        answers[i] = ask("какой процессор взять для монтажа")
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream_requests(stats_url) == 1
+    assert len(set(answers)) == 1
+    assert flight.leaders == 1
+    assert flight.shared == sessions - 1
+
+
+def test_different_questions_are_not_coalesced(start_mock, monkeypatch, tmp_path):
+    url, stats_url = start_mock(latency=0.3, tokens_per_second=1000, answer_tokens=10)
+    monkeypatch.setattr(task7, "completion_url", url)
+    ask = make_ask(ChatCache(str(tmp_path / "cache.sqlite3")), SingleFlight())
+
+    threads = [threading.Thread(target=ask, args=(f"вопрос {i}",)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream_requests(stats_url) == 3
+
+
+def test_waiter_stops_waiting_for_hung_leader(start_mock, monkeypatch):
+    url, stats_url = start_mock(latency=0.05, tokens_per_second=1000, answer_tokens=10)
+    monkeypatch.setattr(task7, "completion_url", url)
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", release.wait))
+    leader.start()
+    try:
+        while not flight.calls:
+            time.sleep(0.01)
+        answer = flight.do("key", task7.get_yandex_gpt_openai_response, "вопрос", [], timeout=0.2)
+    finally:
+        release.set()
+        leader.join()
+
+    assert answer
+    assert flight.timeouts == 1
+    assert upstream_requests(stats_url) == 1
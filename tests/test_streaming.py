@@ -0,0 +1,28 @@
+import requests
+
+import task7
+from async_gpt import AsyncGptClient
+
+
+def test_stream_yields_partial_text(start_mock, monkeypatch):
+    url, stats_url = start_mock(latency=0.05, tokens_per_second=500, answer_tokens=20)
+    monkeypatch.setattr(task7, "completion_url", url)
+
+    chunks = list(task7.stream_yandex_gpt_response("игровой ноутбук до 1000", []))
+
+    assert len(chunks) > 1
+    answer = "".join(chunks)
+    assert answer.startswith("игровой ноутбук до 1000")
+    assert len(answer.split()) == 20
+    assert requests.get(stats_url).json()["requests"] == 1
+
+
+def test_async_client_stream(start_mock, monkeypatch):
+    url, stats_url = start_mock(latency=0.05, tokens_per_second=500, answer_tokens=20)
+    monkeypatch.setattr(task7, "completion_url", url)
+
+    chunks = list(AsyncGptClient(max_concurrent=2).stream("что выбрать", []))
+
+    assert len(chunks) > 1
+    assert "".join(chunks).startswith("что выбрать")
+    assert requests.get(stats_url).json()["requests"] == 1